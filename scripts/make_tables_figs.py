@@ -12,6 +12,9 @@
 from __future__ import annotations
 
 import argparse
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import json
 import glob
@@ -20,27 +23,55 @@ import matplotlib.pyplot as plt
 
 from factors import io as fio
 
+try:
+    import orjson  # optional, faster JSON decoding
+except Exception:
+    orjson = None
+
+
+def _read_metrics_file(path: str):
+    """Return (parsed_json, error) for one metrics file; exactly one of them is None."""
+    try:
+        data = Path(path).read_bytes()
+        return (orjson.loads(data) if orjson is not None else json.loads(data)), None
+    except Exception as e:
+        return None, e
+
 
 def load_metrics_glob(pattern: str) -> pd.DataFrame:
     files = sorted(glob.glob(pattern, recursive=True))
-    rows = []
-    for f in files:
-        try:
-            d = json.loads(Path(f).read_text(encoding="utf-8"))
-            # best-effort flattening for nested objects
-            row = {"_path": f}
-            for k, v in d.items():
-                if isinstance(v, (str, int, float, bool)):
-                    row[k] = v
-                else:
-                    # store JSON repr for non-scalar
-                    row[k] = json.dumps(v)
-            rows.append(row)
-        except Exception as e:
-            print(f"[make_tables_figs] failed to read {f}: {e}")
-    if not rows:
+    # files are read concurrently (I/O bound), then assembled column-wise in file order
+    with ThreadPoolExecutor(max_workers=min(32, os.cpu_count() or 1)) as pool:
+        parsed = list(pool.map(_read_metrics_file, files))
+    cols = defaultdict(list)
+    n_rows = 0
+    for f, (d, err) in zip(files, parsed):
+        if err is None and not isinstance(d, dict):
+            err = TypeError(f"expected a JSON object, got {type(d).__name__}")
+        if err is not None:
+            print(f"[make_tables_figs] failed to read {f}: {err}")
+            continue
+        # best-effort flattening for nested objects
+        row = {"_path": f}
+        for k, v in d.items():
+            if isinstance(v, (str, int, float, bool)):
+                row[k] = v
+            else:
+                # store JSON repr for non-scalar
+                row[k] = json.dumps(v)
+        for k, v in row.items():
+            col = cols[k]
+            if len(col) < n_rows:
+                # key first seen in this file: earlier rows lack it
+                col.extend([None] * (n_rows - len(col)))
+            col.append(v)
+        n_rows += 1
+        for col in cols.values():
+            if len(col) < n_rows:
+                col.append(None)
+    if not n_rows:
         return pd.DataFrame()
-    return pd.DataFrame(rows)
+    return pd.DataFrame(cols)
 
 
 def make_summary_figure(df: pd.DataFrame, out_dir: Path):
@@ -21,11 +21,14 @@
 #   <out>/metrics.json
 #   <out>/run_metadata.json
 #   <out>/cell_means.csv
-#   <out>/bootstrap_replicates.parquet  (if applicable)
+#   <out>/bootstrap_replicates.parquet  (only with bootstrap.save_replicates: true)
 
 from __future__ import annotations
 
 import argparse
+import copy
+import functools
+import hashlib
 import json
 import os
 import sys
@@ -38,27 +41,46 @@ import pandas as pd
 import numpy as np
 
 # factors modules
-from factors import (
-    estimate_two_factor_cell_means,
-)
 from factors import bootstrap as fb
 from factors import score as fs
 from factors import pci as fp
 from factors import io as fio
 from factors import utils as fut
+from factors.effects import estimate_two_factor_cell_means_arr
 
 # optional: torchvision for fmnist
 try:
     import torchvision
     from torchvision.datasets import FashionMNIST
-    from torchvision import transforms
 except Exception:
     FashionMNIST = None
 
+# optional: pyarrow to look up Parquet column names before a projected read
+try:
+    import pyarrow.parquet as pq
+except Exception:
+    pq = None
+
+
+# libyaml-backed loader when PyYAML was built with it, pure-Python SafeLoader otherwise
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+@functools.lru_cache(maxsize=100)
+def _load_yaml_cached(resolved: str, mtime_ns: int, size: int) -> dict:
+    # mtime_ns/size are part of the cache key only: an edited file is parsed again
+    with open(resolved, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=_YAML_LOADER)
+
 
 def load_yaml(path: Path) -> dict:
-    with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    """Parse a YAML file, reusing the previous parse while the file is unchanged.
+
+    A deep copy is returned so callers may mutate the result freely.
+    """
+    p = Path(path).resolve()
+    st = p.stat()
+    return copy.deepcopy(_load_yaml_cached(str(p), st.st_mtime_ns, st.st_size))
 
 
 def merge_dicts(a: dict, b: dict) -> dict:
@@ -68,24 +90,78 @@ def merge_dicts(a: dict, b: dict) -> dict:
     return out
 
 
-def load_tabular_from_config(cfg: dict, repo_root: Path) -> pd.DataFrame:
+# Description of the per-image summary built from FashionMNIST; it is hashed into the cache
+# file name, so changing the preprocessing below must change this string as well.
+_FMNIST_SUMMARY_SPEC = "train=True;label=targets:int64;mean_pixel=mean(data:uint8)/255"
+
+
+def _fmnist_cache_path(ds: dict, repo_root: Path) -> Path:
+    processed = ds.get("files", {}).get("processed") or "data/processed/fmnist"
+    key = hashlib.sha1(_FMNIST_SUMMARY_SPEC.encode("utf-8")).hexdigest()[:12]
+    return repo_root / processed / f"fmnist_meanpixel_{key}.parquet"
+
+
+def bin_codes(values: np.ndarray, edges) -> pd.arrays.IntegerArray:
     """
-    Generic loader for CSV / parquet based dataset configs. For FMNIST use torchvision hook.
+    Integer bin codes for values, matching pd.cut(values, edges, labels=False, include_lowest=True):
+    bins are right-closed, the first one also includes its left edge. Missing or out-of-range
+    values get <NA>. Codes are returned as a nullable Int16 array rather than strings.
+    """
+    edges = np.asarray(edges, dtype=np.float64)
+    codes = np.searchsorted(edges, values, side="left") - 1
+    codes[values == edges[0]] = 0
+    missing = np.isnan(values) | (codes < 0) | (codes >= len(edges) - 1)
+    codes[missing] = 0
+    return pd.arrays.IntegerArray(codes.astype(np.int16), missing)
+
+
+def required_columns(cfg: dict) -> set[str] | None:
+    """
+    Columns the pipeline can read from the input table: the two factors, the source columns of
+    suggested binning rules and the target (configured name plus the fallbacks used in main).
+    Returns None when no factors are configured, in which case the whole table is loaded.
+    """
+    factors = cfg.get("factors_for_doe", {})
+    if not (factors.get("factor_a") and factors.get("factor_b")):
+        return None
+    needed = {factors["factor_a"], factors["factor_b"]}
+    suggested = cfg.get("preprocessing", {}).get("suggested_binning", {}) or {}
+    needed.update(rule.get("column") for rule in suggested.values() if rule.get("column"))
+    target = cfg.get("columns", {}).get("target") or cfg.get("dataset", {}).get("target") or "target"
+    needed.update({target, "compressive_strength", "class", "label", "mean_pixel"})
+    return needed
+
+
+def load_tabular_from_config(cfg: dict, repo_root: Path, columns: set[str] | None = None) -> pd.DataFrame:
+    """
+    Generic loader for CSV / parquet based dataset configs. For FMNIST use torchvision hook;
+    the derived (label, mean_pixel) table is cached as Parquet under the processed directory.
+
+    If columns is given, only those of them present in the file are read (unknown names are
+    ignored), so unused columns are never parsed.
     """
     ds = cfg.get("dataset", {})
     provider = ds.get("source", {}).get("provider", None)
+    if provider and "FashionMNIST" in str(provider):
+        cache_path = _fmnist_cache_path(ds, repo_root)
+        if cache_path.exists():
+            return pd.read_parquet(cache_path, columns=["label", "mean_pixel"])
     if provider and "FashionMNIST" in str(provider) and FashionMNIST is not None:
         # prepare torchvision download path
         root = repo_root / ds.get("files", {}).get("raw", "data/raw/fmnist")
-        transform = transforms.Compose([transforms.ToTensor()])
-        dataset = FashionMNIST(root=str(root), train=True, download=True, transform=transform)
-        # Convert to a small DataFrame with 'image' and 'label' columns for quick sanity; for full runs user should use dedicated training script
-        rows = []
-        for i in range(len(dataset)):
-            img, label = dataset[i]
-            # flatten small image to vector summary: mean pixel value (toy metric)
-            rows.append({"label": int(label), "mean_pixel": float(img.mean().item())})
-        return pd.DataFrame(rows)
+        dataset = FashionMNIST(root=str(root), train=True, download=True, transform=None)
+        # Summarize each image by its mean pixel value (toy metric, same scale as ToTensor: [0, 1]),
+        # reduced in one pass over the raw uint8 array; for full runs use a dedicated training script
+        imgs = dataset.data.numpy()
+        mean_pixel = imgs.reshape(len(imgs), -1).mean(axis=1) / 255.0
+        labels = dataset.targets.numpy().astype(np.int64)
+        df = pd.DataFrame({"label": labels, "mean_pixel": mean_pixel})
+        try:
+            fio.save_parquet(df, cache_path)
+        except Exception as e:
+            # caching is best-effort (e.g. pyarrow missing or read-only checkout)
+            warnings.warn(f"Could not cache FashionMNIST summary to {cache_path}: {e}")
+        return df
     # otherwise load file path
     raw = ds.get("files", {}).get("raw")
     processed = ds.get("files", {}).get("processed")
@@ -95,13 +171,18 @@ def load_tabular_from_config(cfg: dict, repo_root: Path) -> pd.DataFrame:
         path = repo_root / raw
     else:
         raise FileNotFoundError(f"Neither processed nor raw file found for dataset in config: raw={raw}, processed={processed}")
+    usecols = None if columns is None else (lambda c: c in columns)
     if str(path).endswith(".csv"):
-        return pd.read_csv(path)
+        return pd.read_csv(path, usecols=usecols)
     elif str(path).endswith(".parquet") or str(path).endswith(".pq"):
+        if columns is not None and pq is not None:
+            # project at read time: only the needed column chunks are decoded
+            present = [c for c in pq.read_schema(path).names if c in columns]
+            return pd.read_parquet(path, columns=present)
         return pd.read_parquet(path)
     else:
         # try pandas read_table
-        return pd.read_csv(path)
+        return pd.read_csv(path, usecols=usecols)
 
 
 def main(argv: list[str] | None = None):
@@ -130,15 +211,17 @@ def main(argv: list[str] | None = None):
 
     # set seed and determinism
     fut.set_seed(args.seed)
+    fut.warn_if_hash_seed_unset(args.seed)
     if args.deterministic:
-        fut.enable_deterministic_torch()
+        # the flag is an explicit opt-in, so fail on ops without a deterministic kernel
+        fut.enable_deterministic_torch(mode="strict")
 
     # write run metadata early
     fio.write_run_metadata(out_dir, config=cfg)
 
     # load data
     try:
-        df = load_tabular_from_config(cfg, repo_root)
+        df = load_tabular_from_config(cfg, repo_root, columns=required_columns(cfg))
     except Exception as e:
         msg = f"Failed to load dataset from config {cfg_path}: {e}"
         print(msg, file=sys.stderr)
@@ -159,12 +242,15 @@ def main(argv: list[str] | None = None):
             for key, rule in suggested.items():
                 col = rule.get("column")
                 if col in df.columns:
+                    values = df[col].to_numpy(dtype=np.float64)
                     if rule.get("method") == "edges":
                         edges = rule.get("edges", [])
-                        df[key] = pd.cut(df[col], bins=edges, labels=False, include_lowest=True).astype(str)
+                        df[key] = bin_codes(values, edges)
                     elif rule.get("method") == "quantiles":
                         qs = rule.get("quantiles", [])
-                        df[key] = pd.qcut(df[col], q=[0.0] + qs + [1.0], labels=False, duplicates="drop").astype(str)
+                        # same edges as pd.qcut(..., duplicates="drop")
+                        edges = np.unique(np.nanquantile(values, [0.0] + qs + [1.0]))
+                        df[key] = bin_codes(values, edges)
             # re-check
         if factor_a not in df.columns or factor_b not in df.columns:
             raise KeyError(f"Required factor columns not found in data: {factor_a}, {factor_b}")
@@ -181,27 +267,41 @@ def main(argv: list[str] | None = None):
             else:
                 raise KeyError(f"Cannot determine target column for dataset; looked for {target_col}")
 
-        # compute cell means
-        cell_means = estimate_two_factor_cell_means(df, factor_a, factor_b, outcome_col=target_col)
+        # compute cell means as a plain array (the labelled table is only built for CSV/scoring),
+        # together with the per-cell observation arrays consumed by the bootstrap; both come from
+        # the same level codes, so there is one grouping pass in the library's sorted cell order
+        M, levels_a, levels_b, groups = estimate_two_factor_cell_means_arr(df, factor_a, factor_b, target_col, return_groups=True)
+        cell_means = pd.DataFrame(M, index=levels_a.rename(factor_a), columns=levels_b.rename(factor_b))
         # save cell means
         cell_means.to_csv(out_dir / "cell_means.csv")
 
         # bootstrap pipeline (may be expensive; controlled by config or defaults)
-        bootstrap_n = int(cfg.get("bootstrap", {}).get("n_boot", cfg.get("bootstrap", {}).get("n_boot", 200)))
-        boot_dict = fb.bootstrap_cell_statistics(df, group_cols=[factor_a, factor_b], value_col=target_col, n_boot=bootstrap_n, random_state=args.seed)
-        boot_df = fb.bootstrap_to_dataframe(boot_dict)
-        # Save replicates in parquet for compactness
-        try:
-            boot_df.to_parquet(out_dir / "bootstrap_replicates.parquet")
-        except Exception:
-            # fallback to pickle if parquet not available
-            boot_df.to_pickle(out_dir / "bootstrap_replicates.pkl")
-
-        ci_df = fb.compute_bootstrap_ci(boot_df, alpha=float(cfg.get("bootstrap", {}).get("ci_alpha", 0.05)))
+        boot_cfg = cfg.get("bootstrap", {})
+        bootstrap_n = int(boot_cfg.get("n_boot", 200))
+        boot_items = fb.iter_bootstrap_cell_statistics(df, group_cols=[factor_a, factor_b], value_col=target_col, n_boot=bootstrap_n, random_state=args.seed, groups=groups)
+        if boot_cfg.get("save_replicates", False):
+            # raw replicates are only materialized when they are persisted
+            boot_dict = dict(boot_items)
+            boot_items = boot_dict.items()
+            boot_df = fb.bootstrap_to_dataframe(boot_dict)
+            # Save replicates in parquet for compactness; the cell keys become two dictionary-encoded
+            # columns named after the factors instead of a MultiIndex
+            try:
+                replicates = boot_df.rename_axis([factor_a, factor_b]).reset_index()
+                for col in (factor_a, factor_b):
+                    replicates[col] = replicates[col].astype("category")
+                fio.save_parquet(replicates, out_dir / "bootstrap_replicates.parquet")
+            except Exception:
+                # fallback to pickle if parquet not available
+                boot_df.to_pickle(out_dir / "bootstrap_replicates.pkl")
+
+        # per-cell summaries are computed as replicates are produced
+        ci_df = fb.compute_bootstrap_ci_streaming(boot_items, alpha=float(boot_cfg.get("ci_alpha", 0.05)))
         ci_df.to_csv(out_dir / "bootstrap_ci.csv")
 
-        # uncertainty matrix aligned with cell_means
-        uncertainty = fs.compute_uncertainty_from_bootstrap(boot_dict, levels_a=list(cell_means.index), levels_b=list(cell_means.columns), aggfunc="se")
+        # uncertainty matrix aligned with cell_means: standard error of the replicate mean, computed
+        # from the streamed summaries as compute_uncertainty_from_bootstrap(..., aggfunc="se") would give
+        uncertainty = fs.compute_uncertainty_from_bootstrap_ci(ci_df, cell_means.index, cell_means.columns, n_reps=bootstrap_n, aggfunc="se")
 
         # optional cost matrix - if not provided, default zeros
         # look for a cost table in config.path costs -> file, or generated synthetic costs
@@ -218,7 +318,7 @@ def main(argv: list[str] | None = None):
 
         # compute PCI
         pci_val = fp.pci_simple(cell_means)
-        results.update({"pci": float(pci_val)})
+        results.update({"pci": pci_val})
 
         # select best cells under budget if optimizer config present
         optimizer_cfg = cfg.get("optimizer", {})
@@ -226,20 +326,20 @@ def main(argv: list[str] | None = None):
         from factors import optimizer as fo
 
         selected, total_cost = fo.greedy_select_under_budget(score, cost=cost_df, budget=budget)
-        results.update({"selected_cells": selected, "selected_total_cost": float(total_cost)})
+        results.update({"selected_cells": selected, "selected_total_cost": total_cost})
 
         # summary metrics: MSE to cell_means? For demonstration compute simple dispersion stats
         results.update(
             {
-                "n_cells": int(np.prod(cell_means.shape)),
-                "cell_means_mean": float(np.nanmean(cell_means.values)),
-                "cell_means_std": float(np.nanstd(cell_means.values)),
+                "n_cells": M.size,
+                "cell_means_mean": np.nanmean(M),
+                "cell_means_std": np.nanstd(M),
             }
         )
 
     else:
         # If no factors specified, do a simple sanity summary of loaded dataframe
-        results.update({"n_rows": int(len(df)), "columns": list(df.columns[:50])})
+        results.update({"n_rows": len(df), "columns": list(df.columns[:50])})
 
     # Save metrics to JSON
     fio.save_metrics_json(results, out_dir / "metrics.json")
@@ -4,9 +4,11 @@
 from .effects import (
     estimate_main_effects,
     estimate_two_factor_cell_means,
+    estimate_two_factor_cell_means_arr,
     two_factor_interaction_matrix,
 )
 from .shap_fit import (
+    TwoFactorFit,
     compute_shap_explainer_values,
     fit_two_factor_approx_from_shap,
 )
@@ -14,7 +16,9 @@ from .shap_fit import (
 __all__ = [
     "estimate_main_effects",
     "estimate_two_factor_cell_means",
+    "estimate_two_factor_cell_means_arr",
     "two_factor_interaction_matrix",
     "compute_shap_explainer_values",
     "fit_two_factor_approx_from_shap",
+    "TwoFactorFit",
 ]
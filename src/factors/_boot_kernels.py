@@ -0,0 +1,55 @@
+# src/factors/_boot_kernels.py
+# Optional numba kernels used by factors.bootstrap.
+#
+# numba is not a hard dependency: when it cannot be imported HAVE_NUMBA is False,
+# the kernels are set to None and callers fall back to the vectorized numpy path.
+
+from __future__ import annotations
+
+import numpy as np
+
+try:
+    from numba import njit, prange  # optional dependency
+except Exception:  # pragma: no cover - numba optional
+    njit = None
+    prange = None
+
+HAVE_NUMBA = njit is not None
+
+if HAVE_NUMBA:
+
+    @njit(inline="always")
+    def _splitmix64(state):
+        """Advance a splitmix64 state and return (new_state, 64-bit output)."""
+        state = state + np.uint64(0x9E3779B97F4A7C15)
+        z = state
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return state, z ^ (z >> np.uint64(31))
+
+    @njit(parallel=True, fastmath=True, nogil=True, cache=True)
+    def _boot_mean(arr, n_boot, seed):
+        """
+        Return an (n_boot,) array of means of arr resampled with replacement.
+
+        Each replicate b draws from its own splitmix64 stream seeded from (seed, b), so the
+        output depends only on seed and not on the number of threads or their scheduling.
+        Indices are consumed on the fly, so no (n_boot, n) index matrix is allocated.
+        """
+        n = arr.size
+        out = np.empty(n_boot, dtype=np.float64)
+        for b in prange(n_boot):
+            state, _ = _splitmix64(np.uint64(seed) ^ (np.uint64(b) * np.uint64(0xD1B54A32D192ED03)))
+            acc = 0.0
+            for _i in range(n):
+                state, z = _splitmix64(state)
+                # top 53 bits -> uniform in [0, 1) -> index in [0, n)
+                j = int((z >> np.uint64(11)) * (1.0 / 9007199254740992.0) * n)
+                if j >= n:
+                    j = n - 1
+                acc += arr[j]
+            out[b] = acc / n
+        return out
+
+else:  # pragma: no cover - numba optional
+    _boot_mean = None
@@ -0,0 +1,178 @@
+# src/factors/_opt_kernels.py
+# Optional numba kernels used by factors.optimizer.
+#
+# numba is not a hard dependency: when it cannot be imported HAVE_NUMBA is False,
+# the kernels are set to None and callers fall back to the pure-Python implementations.
+
+from __future__ import annotations
+
+import numpy as np
+
+try:
+    from numba import get_num_threads, njit, prange  # optional dependency
+except Exception:  # pragma: no cover - numba optional
+    njit = None
+    prange = None
+    get_num_threads = None
+
+HAVE_NUMBA = njit is not None
+
+if HAVE_NUMBA:
+
+    @njit(cache=True, nogil=True)
+    def _suffix_top_sums(score, k):
+        """
+        top[j, m] = sum of the m largest scores among positions j..n-1 (-inf if fewer than m).
+        Used as the optimistic bound of the branch-and-bound search below.
+        """
+        n = score.size
+        top = np.full((n + 1, k + 1), -np.inf)
+        top[:, 0] = 0.0
+        kept = np.empty(k)  # largest scores of the current suffix, descending
+        n_kept = 0
+        for j in range(n - 1, -1, -1):
+            v = score[j]
+            # insert v into the descending list, dropping the smallest entry when full
+            pos = n_kept
+            while pos > 0 and kept[pos - 1] < v:
+                pos -= 1
+            if pos < k:
+                last = min(n_kept, k - 1)
+                for q in range(last, pos, -1):
+                    kept[q] = kept[q - 1]
+                kept[pos] = v
+                if n_kept < k:
+                    n_kept += 1
+            acc = 0.0
+            for m in range(1, n_kept + 1):
+                acc += kept[m - 1]
+                top[j, m] = acc
+        return top
+
+    @njit(cache=True, nogil=True)
+    def _bnb_setup(score, cost, k):
+        """Suffix top-k table, rounding slack and cost sign shared by the search kernels below."""
+        n = score.size
+        top = _suffix_top_sums(score, k)
+        max_abs = 0.0
+        nonneg_cost = True
+        for i in range(n):
+            max_abs = max(max_abs, abs(score[i]))
+            if cost[i] < 0:
+                nonneg_cost = False
+        slack = 4.0 * k * k * 2.220446049250313e-16 * max_abs
+        return top, slack, nonneg_cost
+
+    @njit(cache=True, nogil=True)
+    def _bnb_search(score, cost, k, budget, top, slack, nonneg_cost, lo, hi, best):
+        """
+        Branch-and-bound over the k-combinations whose first position lies in [lo, hi).
+
+        Combinations are visited depth-first in lexicographic order (as itertools.combinations)
+        and the best one is replaced only on a strictly larger sum, so ties resolve the same way.
+        Prefix sums are kept per depth and accumulated left to right exactly as sum() over the
+        combination. Branches are pruned when
+          - the prefix sum plus the k - d largest scores still available cannot beat the best
+            sum found so far (the bound only shrinks as the position advances, so the rest of
+            that depth is skipped), or
+          - with non-negative costs, the prefix cost already exceeds the budget.
+        A small slack keeps rounding in the bound from pruning a strictly better combination.
+
+        Returns (best_sum, best_idx); best_idx is all -1 if nothing beat the incoming `best`.
+        """
+        n = score.size
+        best_idx = np.full(k, -1, dtype=np.int64)
+        idx = np.empty(k, dtype=np.int64)
+        ps = np.zeros(k + 1)
+        pc = np.zeros(k + 1)
+        d = 0
+        idx[0] = lo
+        while d >= 0:
+            i = idx[d]
+            if d == 0 and i >= hi:
+                break
+            # not enough positions left, or the optimistic bound cannot beat the incumbent
+            if i > n - (k - d) or ps[d] + top[i, k - d] + slack <= best:
+                d -= 1
+                if d >= 0:
+                    idx[d] += 1
+                continue
+            ps[d + 1] = ps[d] + score[i]
+            pc[d + 1] = pc[d] + cost[i]
+            if nonneg_cost and pc[d + 1] > budget:
+                idx[d] += 1
+                continue
+            if d + 1 == k:
+                if pc[k] <= budget and ps[k] > best:
+                    best = ps[k]
+                    best_idx[:] = idx
+                idx[d] += 1
+                continue
+            d += 1
+            idx[d] = i + 1
+        return best, best_idx
+
+    @njit(cache=True, nogil=True)
+    def _exhaustive_best_k(score, cost, k, budget):
+        """
+        Best k-subset of cells by total score subject to sum(cost) <= budget (see _bnb_search).
+
+        Returns (best_sum, best_idx); best_sum is -inf when no combination fits the budget.
+        """
+        n = score.size
+        if k > n or k == 0:
+            return -np.inf, np.full(k, -1, dtype=np.int64)
+        top, slack, nonneg_cost = _bnb_setup(score, cost, k)
+        return _bnb_search(score, cost, k, budget, top, slack, nonneg_cost, 0, n, -np.inf)
+
+    @njit(cache=True, parallel=True)
+    def _exhaustive_best_k_parallel(score, cost, k, budget):
+        """
+        Multi-threaded _exhaustive_best_k. The subtree of first position 0 (the largest) is
+        searched serially; its best sum, lowered by one ulp, then seeds one independent search per
+        remaining first position (prange), so those still prune but keep any sum that ties it.
+        The reduction keeps the first strictly larger sum in first-position order; per-subtree
+        winners are lexicographically first in their subtree, so the result equals the serial one.
+        """
+        n = score.size
+        if k > n or k == 0:
+            return -np.inf, np.full(k, -1, dtype=np.int64)
+        top, slack, nonneg_cost = _bnb_setup(score, cost, k)
+        best, best_idx = _bnb_search(score, cost, k, budget, top, slack, nonneg_cost, 0, 1, -np.inf)
+        seed = np.nextafter(best, -np.inf)
+        n_first = n - k + 1
+        bests = np.empty(n_first)
+        idxs = np.empty((n_first, k), dtype=np.int64)
+        for f in prange(1, n_first):
+            b, bi = _bnb_search(score, cost, k, budget, top, slack, nonneg_cost, f, f + 1, seed)
+            bests[f] = b
+            idxs[f, :] = bi
+        for f in range(1, n_first):
+            if idxs[f, 0] >= 0 and bests[f] > best:
+                best = bests[f]
+                best_idx[:] = idxs[f]
+        return best, best_idx
+
+    def _num_threads():
+        return get_num_threads()
+
+    @njit(cache=True, nogil=True)
+    def _greedy_take(costs, budget, total):
+        """
+        Budgeted greedy scan over costs already in selection order: take[i] is True when cell i
+        still fits (total + cost <= budget). Returns (take, total) with the updated running total.
+        """
+        n = costs.size
+        take = np.zeros(n, dtype=np.bool_)
+        for i in range(n):
+            c = costs[i]
+            if total + c <= budget:
+                take[i] = True
+                total += c
+        return take, total
+
+else:  # pragma: no cover - numba optional
+    _exhaustive_best_k = None
+    _exhaustive_best_k_parallel = None
+    _num_threads = None
+    _greedy_take = None
@@ -8,11 +8,23 @@
 
 from __future__ import annotations
 
+import functools
+import warnings
 import numpy as np
 import pandas as pd
-from typing import Callable, Dict, Iterable, Tuple, Optional, Any
+from statistics import NormalDist
+from typing import Callable, Dict, Iterable, Iterator, Tuple, Optional, Any
 from collections import defaultdict
 
+from joblib import Parallel, delayed
+
+from ._boot_kernels import HAVE_NUMBA, _boot_mean
+
+
+# Upper bound on the number of resampled values materialized at once by
+# _bootstrap_replicates (~8 MB of float64); larger cells are processed in chunks.
+_MAX_CHUNK_ELEMENTS = 1 << 20
+
 
 def _rng_from_seed(seed: Optional[int]) -> np.random.Generator:
     """Create a numpy Generator from an integer seed or None (uses default)."""
@@ -21,6 +33,97 @@ def _rng_from_seed(seed: Optional[int]) -> np.random.Generator:
     return np.random.default_rng(seed)
 
 
+@functools.lru_cache(maxsize=32)
+def _normal_two_sided_z(alpha: float) -> float:
+    """Return the standard normal quantile z such that P(|Z| <= z) = 1 - alpha."""
+    return NormalDist().inv_cdf(1.0 - alpha / 2.0)
+
+
+def _bootstrap_replicates(
+    arr: np.ndarray,
+    stat: Callable[[np.ndarray], float],
+    n_boot: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """
+    Draw n_boot resamples of arr with replacement and reduce each one with stat.
+
+    Resamples are drawn as a (chunk, n) index matrix and reduced along axis 1, with the
+    chunk size bounded by _MAX_CHUNK_ELEMENTS. np.mean and np.median are reduced directly;
+    any other callable is applied row-wise.
+    """
+    n = arr.size
+    replicates = np.empty(n_boot, dtype=float)
+    chunk = max(1, _MAX_CHUNK_ELEMENTS // n)
+    # int32 indices halve the index matrix traffic and are a native fancy-indexing type
+    idx_dtype = np.int32 if n <= np.iinfo(np.int32).max else np.int64
+    for start in range(0, n_boot, chunk):
+        stop = min(start + chunk, n_boot)
+        idx = rng.integers(0, n, size=(stop - start, n), dtype=idx_dtype)
+        samples = arr[idx]
+        if stat is np.mean:
+            replicates[start:stop] = samples.mean(axis=1)
+        elif stat is np.median:
+            replicates[start:stop] = np.median(samples, axis=1)
+        else:
+            replicates[start:stop] = np.apply_along_axis(stat, 1, samples)
+    return replicates
+
+
+def iter_bootstrap_cell_statistics(
+    df: pd.DataFrame,
+    group_cols: Iterable[str],
+    value_col: str,
+    stat: Callable[[np.ndarray], float] = np.mean,
+    n_boot: int = 1000,
+    random_state: Optional[int] = None,
+    engine: str = "numpy",
+    n_jobs: int = 1,
+    groups: Optional[Dict[Tuple[Any, ...], np.ndarray]] = None,
+) -> Iterator[Tuple[Tuple[Any, ...], np.ndarray]]:
+    """
+    Lazily compute bootstrap replicates of a statistic for each group defined by group_cols.
+
+    Yields one (group key tuple, replicates) pair per group, so callers that only need
+    per-cell summaries never hold the full (n_cells, n_boot) set of replicates in memory.
+    Parameters are those of bootstrap_cell_statistics, which collects this iterator into a dict.
+    """
+    if engine not in ("auto", "numpy", "numba"):
+        raise ValueError("engine must be 'auto', 'numpy' or 'numba'")
+    if engine == "numba" and not HAVE_NUMBA:
+        raise ImportError("numba is required for engine='numba'. Install with `pip install numba`.")
+    use_numba = stat is np.mean and HAVE_NUMBA and engine != "numpy"
+
+    rng = _rng_from_seed(random_state)
+    if groups is None:
+        groups = df.groupby(list(group_cols))[value_col]
+    else:
+        groups = groups.items()
+    keys = []
+    arrays = []
+    for key, values in groups:
+        arr = np.asarray(values, dtype=float)
+        keys.append(key if isinstance(key, tuple) else (key,))
+        arrays.append(arr[~np.isnan(arr)])
+    seeds = rng.integers(0, np.iinfo(np.int64).max, size=len(arrays))
+
+    def _one(arr: np.ndarray, seed: int) -> np.ndarray:
+        if arr.size == 0:
+            return np.full(n_boot, np.nan)
+        if use_numba:
+            return _boot_mean(arr, n_boot, seed)
+        return _bootstrap_replicates(arr, stat, n_boot, np.random.default_rng(seed))
+
+    if n_jobs == 1:
+        for key, arr, seed in zip(keys, arrays, seeds):
+            yield key, _one(arr, seed)
+    else:
+        replicates = Parallel(n_jobs=n_jobs, prefer="threads", return_as="generator")(
+            delayed(_one)(arr, seed) for arr, seed in zip(arrays, seeds)
+        )
+        yield from zip(keys, replicates)
+
+
 def bootstrap_cell_statistics(
     df: pd.DataFrame,
     group_cols: Iterable[str],
@@ -28,6 +131,9 @@ def bootstrap_cell_statistics(
     stat: Callable[[np.ndarray], float] = np.mean,
     n_boot: int = 1000,
     random_state: Optional[int] = None,
+    engine: str = "numpy",
+    n_jobs: int = 1,
+    groups: Optional[Dict[Tuple[Any, ...], np.ndarray]] = None,
 ) -> Dict[Tuple[Any, ...], np.ndarray]:
     """
     Compute bootstrap replicates of a statistic for each group defined by group_cols.
@@ -35,7 +141,7 @@ def bootstrap_cell_statistics(
     Parameters
     ----------
     df :
-        Input DataFrame.
+        Input DataFrame (unused when groups is given).
     group_cols :
         Iterable of column names to group by (for 2-factor cells use two names).
     value_col :
@@ -46,6 +152,17 @@ def bootstrap_cell_statistics(
         Number of bootstrap replicates.
     random_state :
         Optional integer seed for reproducibility.
+    engine :
+        'numpy' (default), 'numba' or 'auto'. Both engines are reproducible for a given seed but
+        draw different resamples, so the default does not depend on which optional packages are
+        installed. 'numba' is opt-in and only covers stat=np.mean; 'auto' uses it when numba is
+        importable and falls back to numpy otherwise, so its replicates depend on the install.
+    n_jobs :
+        Number of threads used to process cells concurrently (joblib semantics, -1 = all).
+        Each cell gets its own child seed, so results do not depend on n_jobs.
+    groups :
+        Optional precomputed mapping group key -> 1D array of values, e.g. built from a GroupBy
+        the caller already has. When given, df is not grouped again.
 
     Returns
     -------
@@ -53,25 +170,19 @@ def bootstrap_cell_statistics(
         Mapping from group key tuple (level1, level2, ...) to numpy array of shape (n_boot,)
         containing bootstrap replicate values.
     """
-    rng = _rng_from_seed(random_state)
-    boot_results: Dict[Tuple[Any, ...], np.ndarray] = {}
-    grouped = df.groupby(list(group_cols))[value_col]
-
-    for key, series in grouped:
-        arr = np.asarray(series.dropna(), dtype=float)
-        n = arr.size
-        if n == 0:
-            boot_results[key if isinstance(key, tuple) else (key,)] = np.full(n_boot, np.nan)
-            continue
-        # For each bootstrap replicate draw with replacement from arr
-        replicates = np.empty(n_boot, dtype=float)
-        for i in range(n_boot):
-            # sample indices then compute stat
-            idx = rng.integers(0, n, size=n)
-            sample = arr[idx]
-            replicates[i] = float(stat(sample))
-        boot_results[key if isinstance(key, tuple) else (key,)] = replicates
-    return boot_results
+    return dict(
+        iter_bootstrap_cell_statistics(
+            df,
+            group_cols,
+            value_col,
+            stat=stat,
+            n_boot=n_boot,
+            random_state=random_state,
+            engine=engine,
+            n_jobs=n_jobs,
+            groups=groups,
+        )
+    )
 
 
 def bootstrap_to_dataframe(
@@ -98,25 +209,21 @@ def bootstrap_to_dataframe(
     pandas.DataFrame
         MultiIndex DataFrame with shape (n_cells, n_boot).
     """
-    # Build rows
-    rows = []
-    values = []
-    for key, arr in boot_dict.items():
-        # ensure key is a tuple
-        if not isinstance(key, tuple):
-            key = (key,)
-        rows.append(tuple(key))
-        values.append(np.asarray(arr, dtype=float))
-
-    if not rows:
+    if not boot_dict:
         return pd.DataFrame()
 
-    # Determine max replicates length and pad shorter arrays with nan
-    n_rep = max(len(v) for v in values)
-    vals_padded = np.vstack([np.pad(v, (0, n_rep - len(v)), constant_values=np.nan) for v in values])
+    # Fill a single (n_cells, n_rep) buffer; cells with fewer replicates are padded with nan
+    lens = [len(v) for v in boot_dict.values()]
+    n_rep = max(lens)
+    if min(lens) == n_rep:
+        vals_padded = np.empty((len(lens), n_rep), dtype=np.float64)
+    else:
+        vals_padded = np.full((len(lens), n_rep), np.nan, dtype=np.float64)
+    for i, v in enumerate(boot_dict.values()):
+        vals_padded[i, : len(v)] = v
 
-    # Create MultiIndex
-    index = pd.MultiIndex.from_tuples(rows)
+    # Create MultiIndex (keys are normalized to tuples)
+    index = pd.MultiIndex.from_tuples([k if isinstance(k, tuple) else (k,) for k in boot_dict.keys()])
     col_names = [f"boot_{i}" for i in range(vals_padded.shape[1])]
     df = pd.DataFrame(vals_padded, index=index, columns=col_names)
 
@@ -129,6 +236,76 @@ def bootstrap_to_dataframe(
     return df
 
 
+_CI_COLUMNS = ("estimate", "se", "ci_lower", "ci_upper")
+
+
+def _order_stat_ranks(n: np.ndarray, alpha: float) -> Tuple[np.ndarray, np.ndarray]:
+    """0-based ranks of the lower/upper percentile order statistics among n replicates."""
+    k_lo = np.floor(alpha / 2.0 * n).astype(np.intp)
+    k_hi = np.ceil((1.0 - alpha / 2.0) * n).astype(np.intp) - 1
+    top = np.maximum(n - 1, 0)
+    return np.clip(k_lo, 0, top), np.clip(k_hi, 0, top)
+
+
+def _summarize_replicates(M: np.ndarray, alpha: float, ci_method: str) -> Dict[str, np.ndarray]:
+    """
+    Row-wise estimate, standard error and CI bounds of a (n_cells, n_rep) replicate matrix.
+    NaN entries (empty cells, padding) are skipped; all-NaN rows give NaN summaries.
+
+    Percentile bounds are the order statistics of rank floor(alpha/2 * B) and
+    ceil((1 - alpha/2) * B) - 1 among the B replicates of a row. Complete rows (the common case)
+    are reduced in one pass: mean and deviations feed the standard error, and a single
+    np.partition selects both bounds instead of a full sort per quantile.
+    """
+    if ci_method not in ("percentile", "se"):
+        raise ValueError("ci_method must be 'percentile' or 'se'")
+    n_cells, n_rep = M.shape
+    estimates = np.full(n_cells, np.nan)
+    se = np.full(n_cells, np.nan)
+    lower = np.full(n_cells, np.nan)
+    upper = np.full(n_cells, np.nan)
+
+    has_nan = np.isnan(M).any(axis=1)
+    dense = np.flatnonzero(~has_nan)
+    if dense.size and n_rep:
+        D = M[dense]
+        mu = D.mean(axis=1)
+        dev = D - mu[:, None]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            se[dense] = np.sqrt(np.einsum("ij,ij->i", dev, dev) / (n_rep - 1))
+        estimates[dense] = mu
+        if ci_method == "percentile":
+            k_lo, k_hi = _order_stat_ranks(np.asarray(n_rep), alpha)
+            part = np.partition(D, np.unique([k_lo, k_hi]), axis=1)
+            lower[dense] = part[:, k_lo]
+            upper[dense] = part[:, k_hi]
+
+    ragged = np.flatnonzero(has_nan)
+    if ragged.size:
+        R = M[ragged]
+        with warnings.catch_warnings():
+            # all-NaN rows (empty cells) legitimately produce NaN summaries
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            estimates[ragged] = np.nanmean(R, axis=1)
+            se[ragged] = np.nanstd(R, axis=1, ddof=1)
+        if ci_method == "percentile":
+            # NaNs sort last, so the valid replicates of each row occupy its first n entries
+            n_valid = (~np.isnan(R)).sum(axis=1)
+            k_lo, k_hi = _order_stat_ranks(n_valid, alpha)
+            S = np.sort(R, axis=1)
+            rows = np.arange(len(ragged))
+            empty = n_valid == 0
+            lower[ragged] = np.where(empty, np.nan, S[rows, k_lo])
+            upper[ragged] = np.where(empty, np.nan, S[rows, k_hi])
+
+    if ci_method == "se":
+        # normal approximation
+        z = _normal_two_sided_z(float(alpha))
+        lower = estimates - z * se
+        upper = estimates + z * se
+    return {"estimate": estimates, "se": se, "ci_lower": lower, "ci_upper": upper}
+
+
 def compute_bootstrap_ci(
     boot_df: pd.DataFrame, alpha: float = 0.05, ci_method: str = "percentile"
 ) -> pd.DataFrame:
@@ -150,30 +327,38 @@ def compute_bootstrap_ci(
         DataFrame with columns: estimate, se, ci_lower, ci_upper (index same as boot_df.index)
     """
     if boot_df.empty:
-        return pd.DataFrame(columns=["estimate", "se", "ci_lower", "ci_upper"])
-
-    estimates = boot_df.mean(axis=1)
-    se = boot_df.std(axis=1, ddof=1)
-    if ci_method == "percentile":
-        lower = boot_df.quantile(q=alpha / 2.0, axis=1)
-        upper = boot_df.quantile(q=1.0 - alpha / 2.0, axis=1)
-    elif ci_method == "se":
-        # normal approximation
-        z = abs(np.percentile(np.random.standard_normal(100000), 100 * (1 - alpha / 2.0)))  # approx z
-        lower = estimates - z * se
-        upper = estimates + z * se
-    else:
-        raise ValueError("ci_method must be 'percentile' or 'se'")
+        return pd.DataFrame(columns=list(_CI_COLUMNS))
 
-    out = pd.DataFrame(
-        {
-            "estimate": estimates,
-            "se": se,
-            "ci_lower": lower,
-            "ci_upper": upper,
-        }
-    )
-    return out
+    cols = _summarize_replicates(boot_df.to_numpy(dtype=np.float64), alpha, ci_method)
+    return pd.DataFrame(cols, index=boot_df.index)
+
+
+def compute_bootstrap_ci_streaming(
+    boot_items: Iterable[Tuple[Tuple[Any, ...], np.ndarray]],
+    alpha: float = 0.05,
+    ci_method: str = "percentile",
+) -> pd.DataFrame:
+    """
+    Same summaries as compute_bootstrap_ci, computed cell by cell from an iterable of
+    (key, replicates) pairs such as iter_bootstrap_cell_statistics(...) or boot_dict.items().
+
+    Each cell's replicates are reduced as soon as they are produced and can then be released,
+    so peak memory is one cell's replicates rather than the full (n_cells, n_boot) matrix.
+
+    Returns
+    -------
+    pandas.DataFrame
+        DataFrame with columns: estimate, se, ci_lower, ci_upper indexed by the cell keys.
+    """
+    keys = []
+    rows = []
+    for key, arr in boot_items:
+        keys.append(key if isinstance(key, tuple) else (key,))
+        summary = _summarize_replicates(np.asarray(arr, dtype=np.float64)[None, :], alpha, ci_method)
+        rows.append([summary[c][0] for c in _CI_COLUMNS])
+    if not rows:
+        return pd.DataFrame(columns=list(_CI_COLUMNS))
+    return pd.DataFrame(rows, index=pd.MultiIndex.from_tuples(keys), columns=list(_CI_COLUMNS))
 
 
 def bootstrap_pipeline_cellmeans(
@@ -185,7 +370,8 @@ def bootstrap_pipeline_cellmeans(
     stat: Callable[[np.ndarray], float] = np.mean,
     random_state: Optional[int] = None,
     alpha: float = 0.05,
-) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    keep_replicates: bool = True,
+) -> Tuple[Optional[pd.DataFrame], pd.DataFrame]:
     """
     Convenience pipeline that runs bootstrap for two-factor cell means and returns:
       - boot_df: MultiIndex DataFrame of replicates
@@ -207,11 +393,19 @@ def bootstrap_pipeline_cellmeans(
         Optional seed.
     alpha :
         CI significance level.
+    keep_replicates :
+        If False, CIs are computed cell by cell without materializing the replicates and
+        boot_df is returned as None.
 
     Returns
     -------
     (boot_df, ci_df)
     """
+    if not keep_replicates:
+        boot_iter = iter_bootstrap_cell_statistics(
+            df, group_cols=[factor_a, factor_b], value_col=outcome_col, stat=stat, n_boot=n_boot, random_state=random_state
+        )
+        return None, compute_bootstrap_ci_streaming(boot_iter, alpha=alpha, ci_method="percentile")
     boot_dict = bootstrap_cell_statistics(
         df, group_cols=[factor_a, factor_b], value_col=outcome_col, stat=stat, n_boot=n_boot, random_state=random_state
     )
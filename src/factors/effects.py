@@ -4,10 +4,14 @@
 
 from __future__ import annotations
 
+import warnings
+
 import numpy as np
 import pandas as pd
 from typing import Iterable, Tuple, Dict, Optional
 
+from .utils import _encode_factor
+
 
 def estimate_main_effects(
     df: pd.DataFrame,
@@ -36,17 +40,37 @@ def estimate_main_effects(
         Mapping factor_name -> pandas.Series indexed by factor level containing marginal means.
     """
     effects: Dict[str, pd.Series] = {}
+    # the outcome (and weights) are read once and shared by all factors; each factor is then a
+    # bincount over its level codes instead of a separate groupby over the outcome column
+    y = df[outcome_col].to_numpy(dtype=np.float64)
+    if groupby_weights_col is None:
+        y_ok = ~np.isnan(y)
+        y_vals = y[y_ok]
+    else:
+        # weighted mean: sum(w * y) / sum(w), each sum skipping its own missing values
+        w = df[groupby_weights_col].to_numpy(dtype=np.float64)
+        wy = w * y
+        wy_ok = ~np.isnan(wy)
+        w_ok = ~np.isnan(w)
+        wy_vals, w_vals = wy[wy_ok], w[w_ok]
     for f in factor_cols:
-        if groupby_weights_col is None:
-            grp = df.groupby(f)[outcome_col].mean()
-        else:
-            # weighted mean: sum(w * y) / sum(w)
-            s = df.groupby(f).apply(
-                lambda g: (g[outcome_col] * g[groupby_weights_col]).sum()
-                / (g[groupby_weights_col].sum() if g[groupby_weights_col].sum() != 0 else np.nan)
-            )
-            grp = s
-        effects[f] = grp.sort_index()
+        codes, levels = _encode_factor(df[f])
+        n_levels = len(levels)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if groupby_weights_col is None:
+                # missing levels (code -1) go to an extra bin that is dropped
+                c = np.where(codes >= 0, codes, n_levels)[y_ok]
+                sums = np.bincount(c, weights=y_vals, minlength=n_levels + 1)[:n_levels]
+                counts = np.bincount(c, minlength=n_levels + 1)[:n_levels]
+                means = sums / counts
+                name = outcome_col
+            else:
+                c = np.where(codes >= 0, codes, n_levels)
+                num = np.bincount(c[wy_ok], weights=wy_vals, minlength=n_levels + 1)[:n_levels]
+                den = np.bincount(c[w_ok], weights=w_vals, minlength=n_levels + 1)[:n_levels]
+                means = num / np.where(den == 0, np.nan, den)
+                name = None
+        effects[f] = pd.Series(means, index=levels.rename(f), name=name)
     return effects
 
 
@@ -73,8 +97,74 @@ def estimate_two_factor_cell_means(
         DataFrame indexed by levels of factor_a and with columns equal to levels of factor_b.
         Missing cells are filled with NaN.
     """
-    cell_means = df.groupby([factor_a, factor_b])[outcome_col].mean().unstack(level=factor_b)
-    return cell_means
+    # bincount over the combined (a, b) code instead of groupby(...).mean().unstack()
+    M, levels_a, levels_b = estimate_two_factor_cell_means_arr(df, factor_a, factor_b, outcome_col)
+    return pd.DataFrame(M, index=levels_a.rename(factor_a), columns=levels_b.rename(factor_b))
+
+
+def estimate_two_factor_cell_means_arr(
+    df: pd.DataFrame, factor_a: str, factor_b: str, outcome_col: str, return_groups: bool = False
+) -> Tuple[np.ndarray, pd.Index, pd.Index]:
+    """
+    Array version of estimate_two_factor_cell_means for the numeric core of the pipeline.
+
+    Levels are integer-coded with utils._encode_factor (pd.factorize, or the stored codes of categorical
+    columns) and cell sums/counts are accumulated with
+    np.bincount over the flattened (a, b) code, avoiding GroupBy/unstack construction.
+
+    Parameters
+    ----------
+    df :
+        DataFrame containing data
+    factor_a, factor_b :
+        Column names for factor A (rows) and factor B (columns)
+    outcome_col :
+        Outcome variable to average
+    return_groups :
+        Also return the per-cell outcome arrays, split from the same level codes.
+
+    Returns
+    -------
+    (M, levels_a, levels_b) or (M, levels_a, levels_b, groups)
+        M is a float64 array of shape (len(levels_a), len(levels_b)) with NaN for empty cells;
+        levels are sorted and exclude missing values, as in the groupby-based version.
+        groups maps (a_level, b_level) -> float64 array of the cell's outcome values (missing
+        outcomes included) for every non-empty cell, in sorted cell order and original row order
+        within a cell, as df.groupby([factor_a, factor_b])[outcome_col] yields them.
+    """
+    a_codes, levels_a = _encode_factor(df[factor_a])
+    b_codes, levels_b = _encode_factor(df[factor_b])
+    y = df[outcome_col].to_numpy(dtype=np.float64)
+    # rows with a missing factor level or outcome do not contribute to any cell
+    valid = (a_codes >= 0) & (b_codes >= 0) & ~np.isnan(y)
+    n_a, n_b = len(levels_a), len(levels_b)
+    # np.bincount is a single sequential pass; np.add.at on (a, b) pairs is several times slower
+    flat = a_codes.astype(np.intp) * n_b
+    flat += b_codes
+    groups = _split_cells(flat, y, (a_codes >= 0) & (b_codes >= 0), levels_a, levels_b) if return_groups else None
+    if not valid.all():
+        # skip the masked copies in the common case of complete data
+        flat, y = flat[valid], y[valid]
+    sums = np.bincount(flat, weights=y, minlength=n_a * n_b)
+    counts = np.bincount(flat, minlength=n_a * n_b)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        M = (sums / counts).reshape(n_a, n_b)
+    if return_groups:
+        return M, pd.Index(levels_a), pd.Index(levels_b), groups
+    return M, pd.Index(levels_a), pd.Index(levels_b)
+
+
+def _split_cells(
+    flat: np.ndarray, y: np.ndarray, keep: np.ndarray, levels_a: pd.Index, levels_b: pd.Index
+) -> Dict[Tuple, np.ndarray]:
+    """Per-cell slices of y by one stable sort of the flat (a, b) codes of the kept rows."""
+    if not keep.all():
+        flat, y = flat[keep], y[keep]
+    n_b = len(levels_b)
+    order = np.argsort(flat, kind="stable")
+    counts = np.bincount(flat, minlength=len(levels_a) * n_b)
+    parts = np.split(y[order], np.cumsum(counts)[:-1])
+    return {(levels_a[c // n_b], levels_b[c % n_b]): parts[c] for c in np.flatnonzero(counts)}
 
 
 def two_factor_interaction_matrix(
@@ -102,17 +192,26 @@ def two_factor_interaction_matrix(
     if effect_center != "overall":
         raise ValueError("effect_center currently supports only 'overall'")
 
-    overall_mean = cell_means.values[~np.isnan(cell_means.values)].mean()
-    row_means = cell_means.mean(axis=1)
-    col_means = cell_means.mean(axis=0)
-
-    # Broadcast to compute interaction residuals
-    interaction = cell_means.copy()
-    for i in cell_means.index:
-        for j in cell_means.columns:
-            mij = cell_means.loc[i, j]
-            if np.isnan(mij):
-                interaction.loc[i, j] = np.nan
-            else:
-                interaction.loc[i, j] = mij - row_means.loc[i] - col_means.loc[j] + overall_mean
+    interaction = _interaction_residuals(cell_means.to_numpy(dtype=np.float64))
+    return pd.DataFrame(interaction, index=cell_means.index, columns=cell_means.columns, copy=False)
+
+
+def _interaction_residuals(M: np.ndarray) -> np.ndarray:
+    """
+    M - row_means - col_means + overall_mean for a 2D cell-mean array, shared with
+    factors.pci. Means skip missing cells and missing cells stay NaN.
+    """
+    with warnings.catch_warnings():
+        # an all-NaN row/column has an undefined mean; its cells are NaN anyway
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        overall_mean = np.nanmean(M)
+        row_means = np.nanmean(M, axis=1, keepdims=True)
+        col_means = np.nanmean(M, axis=0, keepdims=True)
+
+    # Broadcast into one preallocated buffer updated in place, so the chained expression
+    # does not allocate a temporary per operator; NaN cells stay NaN
+    interaction = np.empty_like(M)
+    np.subtract(M, row_means, out=interaction)
+    interaction -= col_means
+    interaction += overall_mean
     return interaction
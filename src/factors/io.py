@@ -4,38 +4,123 @@
 
 from __future__ import annotations
 
+import functools
+import io
 import json
 import os
 import pickle
 import subprocess
+import sys
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
 import datetime
 
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except Exception:  # orjson is optional; stdlib json is used otherwise
+    orjson = None
+
+try:
+    import safetensors.numpy as st_numpy
+except Exception:  # safetensors is optional
+    st_numpy = None
+
 try:
-    import torch
-except Exception:  # torch is optional
-    torch = None
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except Exception:  # pyarrow is optional
+    pa = None
+    pq = None
 
 from matplotlib.figure import Figure
 
+from .utils import _get_torch
+
+# buffer size for checkpoint and JSON file objects
+_IO_BUFFER_SIZE = 1 << 20
+
+# torch (and safetensors.torch, which imports it) is not imported with this module: saving only
+# uses torch when the caller has already imported it, and loading imports it for torch files only
+# (see _loaded_torch, _safetensors_torch and load_checkpoint)
+
+# zip local-file-header magic; torch.save (since torch 1.6) writes zip archives
+_ZIP_MAGIC = b"PK\x03\x04"
+
+# safetensors metadata key recording whether a checkpoint holds torch tensors ("pt") or numpy arrays ("np")
+_SAFETENSORS_FORMAT_KEY = "factors_format"
+
 
 def ensure_dir(path: Union[str, Path]) -> Path:
     """Ensure a directory exists and return a pathlib.Path object."""
     p = Path(path)
-    p.mkdir(parents=True, exist_ok=True)
+    # one stat when the directory already exists instead of a mkdir attempt per parent
+    if not p.is_dir():
+        p.mkdir(parents=True, exist_ok=True)
     return p
 
 
+def _json_default(obj: Any) -> Any:
+    """Convert numpy scalars/arrays for the stdlib json fallback."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _nonfinite_to_none(obj: Any) -> Any:
+    """
+    Replace NaN/inf floats (python, numpy scalars and float arrays) with None, recursively, so both
+    JSON backends write null: orjson always does, while stdlib json would write bare NaN/Infinity.
+    """
+    if isinstance(obj, (float, np.floating)):
+        return obj if np.isfinite(obj) else None
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind in "fc" and not np.isfinite(obj).all():
+            return _nonfinite_to_none(obj.tolist())
+        return obj
+    if isinstance(obj, dict):
+        return {k: _nonfinite_to_none(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_nonfinite_to_none(v) for v in obj]
+    return obj
+
+
 def atomic_write_json(obj: Any, path: Union[str, Path], indent: int = 2) -> None:
     """
     Write a JSON file atomically by writing to a temporary file and moving it into place.
+
+    Serialization uses orjson when it is installed (indent 2 or None), otherwise stdlib json.
+    numpy scalars and arrays are accepted by both backends, and NaN/inf values are written as
+    null by either. The temporary file is written through
+    a 1 MiB buffer and fsync'ed before the rename, so the final file is never left partially written.
     """
     p = Path(path)
     ensure_dir(p.parent)
+    _write_json_file(obj, p, indent=indent)
+
+
+def _write_json_file(obj: Any, p: Path, indent: int = 2) -> None:
+    """Body of atomic_write_json; the parent directory must already exist."""
     tmp = p.with_suffix(p.suffix + ".tmp")
-    with tmp.open("w", encoding="utf-8") as f:
-        json.dump(obj, f, indent=indent, ensure_ascii=False)
+    obj = _nonfinite_to_none(obj)
+    with tmp.open("wb", buffering=_IO_BUFFER_SIZE) as f:
+        if orjson is not None and indent in (2, None):
+            option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            f.write(orjson.dumps(obj, option=option))
+        else:
+            text = io.TextIOWrapper(f, encoding="utf-8")
+            json.dump(obj, text, indent=indent, ensure_ascii=False, default=_json_default)
+            text.flush()
+            text.detach()  # keep f open for the fsync below
+        f.flush()
+        os.fsync(f.fileno())
     tmp.replace(p)
 
 
@@ -57,14 +142,138 @@ def save_figure(fig: Figure, out_path: Union[str, Path], dpi: int = 300, bbox_in
     fig.savefig(str(p), dpi=dpi, bbox_inches=bbox_inches)
 
 
+def save_figure_bytes(fig: Figure, format: str = "png", dpi: int = 300, bbox_inches: str = "tight") -> memoryview:
+    """
+    Render a matplotlib Figure into memory and return the encoded bytes.
+
+    This separates rendering from disk I/O: figures can be rendered (and closed) as they are
+    produced, and the buffers written later, e.g. with save_many(..., kind="bytes").
+    format="raw" returns uncompressed RGBA pixels instead of an encoded image.
+    """
+    buf = io.BytesIO()
+    fig.savefig(buf, format=format, dpi=dpi, bbox_inches=bbox_inches)
+    return buf.getbuffer()
+
+
+def save_many(
+    items: Iterable[Tuple[Any, Union[str, Path]]],
+    kind: str = "json",
+    max_workers: Optional[int] = None,
+    **kwargs: Any,
+) -> None:
+    """
+    Write several artifacts concurrently on a thread pool.
+
+    Parameters
+    ----------
+    items :
+        Iterable of (object, out_path) pairs: JSON-serializable objects for kind="json",
+        matplotlib Figures for kind="figure", bytes-like buffers (e.g. from save_figure_bytes)
+        for kind="bytes".
+    kind :
+        "json" (written like save_metrics_json), "figure" (written like save_figure) or
+        "bytes" (written verbatim).
+    max_workers :
+        Thread count; defaults to min(8, os.cpu_count()).
+    **kwargs :
+        Forwarded to atomic_write_json (e.g. indent) or Figure.savefig (e.g. dpi, bbox_inches).
+
+    Writes are I/O bound (and Agg rendering releases the GIL for much of savefig), so they
+    overlap well on threads. Each distinct parent directory is created once up front.
+    The first exception raised by any write is re-raised after all writes have finished.
+    """
+    if kind == "json":
+        write = lambda obj, p: _write_json_file(obj, p, **kwargs)
+    elif kind == "figure":
+        opts = {"dpi": 300, "bbox_inches": "tight", **kwargs}
+        write = lambda fig, p: fig.savefig(str(p), **opts)
+    elif kind == "bytes":
+        write = lambda data, p: p.write_bytes(data)
+    else:
+        raise ValueError("kind must be 'json', 'figure' or 'bytes'")
+
+    pairs = [(obj, Path(out_path)) for obj, out_path in items]
+    for parent in {p.parent for _, p in pairs}:
+        ensure_dir(parent)
+    if max_workers is None:
+        max_workers = min(8, os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(write, obj, p) for obj, p in pairs]
+    for fut in futures:
+        fut.result()
+
+
+def save_parquet(
+    df: pd.DataFrame,
+    out_path: Union[str, Path],
+    compression: str = "zstd",
+    compression_level: Optional[int] = 3,
+) -> None:
+    """
+    Save a DataFrame as Parquet through pyarrow with dictionary encoding, column statistics
+    and zstd compression. The index is not written: reset it beforehand to keep it as columns
+    (categorical columns are stored dictionary-encoded, which suits repeated cell labels).
+    Raises ImportError when pyarrow is not installed.
+    """
+    if pq is None:
+        raise ImportError("pyarrow is required to write Parquet files. Install with `pip install pyarrow`.")
+    p = Path(out_path)
+    ensure_dir(p.parent)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_table(
+        table,
+        str(p),
+        compression=compression,
+        compression_level=compression_level,
+        use_dictionary=True,
+        data_page_size=1 << 20,
+        write_statistics=True,
+    )
+
+
+def _loaded_torch():
+    """The torch module if it has already been imported (objects holding tensors imply it), else None."""
+    return sys.modules.get("torch")
+
+
+@functools.lru_cache(maxsize=None)
+def _safetensors_torch():
+    """safetensors.torch, imported on first use; None if safetensors or torch is missing."""
+    if _get_torch() is None:
+        return None
+    try:
+        import safetensors.torch as st_torch
+    except Exception:  # safetensors is optional
+        return None
+    return st_torch
+
+
 def save_checkpoint(obj: Any, out_path: Union[str, Path]) -> None:
     """
-    Save a model checkpoint. If torch is available and the object looks like a torch state_dict,
-    prefer torch.save for compatibility; otherwise use pickle.
+    Save a model checkpoint.
+
+    A flat dict of str -> torch.Tensor (a state_dict) or of str -> numpy array is written with
+    safetensors when it is installed: the tensors are serialized into one bytes buffer and written
+    with a single unbuffered write, without pickling. Other objects, or tensors safetensors rejects
+    (e.g. tied weights sharing storage), use torch.save if torch has been imported by the caller,
+    otherwise pickle; this function never imports torch itself. The file name is kept as given
+    (".pt" by convention); load_checkpoint detects the format.
     """
     p = Path(out_path)
     ensure_dir(p.parent)
-    # Prefer torch.save if torch is present and object is dict-like
+    payload = _safetensors_payload(obj)
+    if payload is not None:
+        module, fmt = payload
+        try:
+            buf = module.save(obj, metadata={_SAFETENSORS_FORMAT_KEY: fmt})
+        except Exception:
+            buf = None
+        if buf is not None:
+            with p.open("wb", buffering=0) as f:
+                f.write(buf)
+            return
+    # Prefer torch.save if torch is loaded and object is dict-like
+    torch = _loaded_torch()
     if torch is not None:
         try:
             torch.save(obj, str(p))
@@ -72,40 +281,164 @@ def save_checkpoint(obj: Any, out_path: Union[str, Path]) -> None:
         except Exception:
             # fallback to pickle
             pass
-    # Pickle fallback
-    with p.open("wb") as f:
-        pickle.dump(obj, f)
+    # Pickle fallback: protocol 5 (HIGHEST_PROTOCOL) frames large buffers efficiently,
+    # and a 1 MiB write buffer keeps the number of write syscalls low
+    with p.open("wb", buffering=_IO_BUFFER_SIZE) as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
 
 
-def load_checkpoint(path: Union[str, Path]) -> Any:
+def _safetensors_payload(obj: Any) -> Optional[Tuple[Any, str]]:
+    """(safetensors module, format tag) if obj can be saved with safetensors, else None."""
+    if not isinstance(obj, dict) or not obj or not all(isinstance(k, str) for k in obj):
+        return None
+    values = list(obj.values())
+    torch = _loaded_torch()
+    if torch is not None and all(isinstance(v, torch.Tensor) for v in values):
+        st_torch = _safetensors_torch()
+        if st_torch is not None:
+            return st_torch, "pt"
+    if st_numpy is not None and all(isinstance(v, np.ndarray) and v.dtype != object for v in values):
+        return st_numpy, "np"
+    return None
+
+
+def _safetensors_format(p: Path) -> Optional[str]:
+    """
+    Format tag of a checkpoint written by save_checkpoint through safetensors, or None for
+    torch/pickle files. A safetensors file starts with the little-endian u64 length of a JSON header.
     """
-    Load a checkpoint saved by save_checkpoint. Try torch.load first if available, otherwise pickle.
+    try:
+        size = p.stat().st_size
+        with p.open("rb") as f:
+            head = f.read(8)
+            if len(head) < 8:
+                return None
+            n = int.from_bytes(head, "little")
+            # torch zip archives and pickles give an implausible header length here
+            if n < 2 or n > size - 8:
+                return None
+            header = f.read(n)
+    except OSError:
+        return None
+    if not header.startswith(b"{"):
+        return None
+    try:
+        meta = json.loads(header).get("__metadata__") or {}
+    except (ValueError, AttributeError):
+        return None
+    return meta.get(_SAFETENSORS_FORMAT_KEY)
+
+
+def load_checkpoint(path: Union[str, Path], mmap: bool = True) -> Any:
+    """
+    Load a checkpoint saved by save_checkpoint. torch.load is used for torch files (zip archives, or
+    legacy files pickle cannot read) and torch is only imported for those; pickles load without it.
+
+    With mmap=True, torch.load memory-maps the file so tensor storages are paged in on access
+    instead of being copied into memory; torch versions or files that do not support it are
+    loaded normally. Checkpoints written with safetensors are returned as a dict of torch
+    tensors (on CPU) or numpy arrays, as they were saved.
     """
     p = Path(path)
     if not p.exists():
         raise FileNotFoundError(p)
+    fmt = _safetensors_format(p)
+    if fmt is not None:
+        module = _safetensors_torch() if fmt == "pt" else st_numpy
+        if module is None:
+            raise ImportError(f"{p} was saved with safetensors; install safetensors (and torch) to load it.")
+        if fmt == "pt":
+            return module.load_file(str(p), device="cpu")
+        return module.load_file(str(p))
+    with p.open("rb") as f:
+        is_zip = f.read(len(_ZIP_MAGIC)) == _ZIP_MAGIC
+    torch = _get_torch() if is_zip else _loaded_torch()
     if torch is not None:
+        if mmap:
+            try:
+                return torch.load(str(p), map_location="cpu", mmap=True)
+            except Exception:
+                # older torch (no mmap kwarg) or a legacy/non-zip file: retry without mmap
+                pass
         try:
             return torch.load(str(p), map_location="cpu")
         except Exception:
             # fallback to pickle
             pass
-    with p.open("rb") as f:
-        return pickle.load(f)
+    try:
+        with p.open("rb", buffering=_IO_BUFFER_SIZE) as f:
+            return pickle.load(f)
+    except Exception:
+        # legacy (pre-zip) torch.save file: torch.load was not tried above if torch was not loaded
+        if torch is not None or _get_torch() is None:
+            raise
+        return _get_torch().load(str(p), map_location="cpu")
 
 
-def git_commit_hash() -> str:
-    """
-    Return the current git commit hash if available, otherwise return 'no-git'.
-    This function calls git via subprocess; it will not fail the program on error.
-    """
+def _find_git_dir(start: Path) -> Optional[Path]:
+    """Return the git directory for start or its closest parent (handles `.git` files of worktrees)."""
+    for d in (start, *start.parents):
+        dot_git = d / ".git"
+        if dot_git.is_dir():
+            return dot_git
+        if dot_git.is_file():
+            content = dot_git.read_text(encoding="utf-8").strip()
+            if content.startswith("gitdir:"):
+                return (d / content[len("gitdir:"):].strip()).resolve()
+    return None
+
+
+def _read_head_hash(git_dir: Path) -> Optional[str]:
+    """Resolve HEAD to a commit hash from the files in git_dir, or None if that is not possible."""
+    head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    if not head.startswith("ref:"):
+        return head or None  # detached HEAD stores the hash itself
+    ref = head[len("ref:"):].strip()
+    # linked worktrees keep shared refs in the common dir
+    common = git_dir
+    if (git_dir / "commondir").is_file():
+        common = (git_dir / (git_dir / "commondir").read_text(encoding="utf-8").strip()).resolve()
+    for base in (git_dir, common):
+        ref_file = base / ref
+        if ref_file.is_file():
+            return ref_file.read_text(encoding="utf-8").strip() or None
+    packed = common / "packed-refs"
+    if packed.is_file():
+        for line in packed.read_text(encoding="utf-8").splitlines():
+            if line and line[0] not in "#^":
+                sha, _, name = line.partition(" ")
+                if name.strip() == ref:
+                    return sha
+    return None
+
+
+@functools.lru_cache(maxsize=8)
+def _git_commit_hash_for(cwd: str) -> str:
+    try:
+        git_dir = _find_git_dir(Path(cwd))
+        if git_dir is not None:
+            sha = _read_head_hash(git_dir)
+            if sha:
+                return sha
+    except OSError:
+        pass
     try:
-        out = subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL)
+        out = subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, cwd=cwd)
         return out.decode("utf-8").strip()
     except Exception:
         return "no-git"
 
 
+def git_commit_hash() -> str:
+    """
+    Return the current git commit hash if available, otherwise return 'no-git'.
+    HEAD is resolved by reading the repository files directly; git is only invoked via
+    subprocess when that fails. The result is cached per working directory for the process.
+    This function will not fail the program on error.
+    """
+    return _git_commit_hash_for(os.getcwd())
+
+
 def write_run_metadata(
     out_dir: Union[str, Path],
     config: Optional[Dict[str, Any]] = None,
@@ -7,16 +7,62 @@
 
 from __future__ import annotations
 
+import math
 from typing import Iterable, List, Tuple, Optional
 import numpy as np
 import pandas as pd
 
+from ._opt_kernels import _exhaustive_best_k, _exhaustive_best_k_parallel, _greedy_take, _num_threads
+
+# exhaustive_best_k searches boards with at least this many k-combinations on all numba threads
+_PARALLEL_MIN_COMBINATIONS = 1 << 20
+
+
+def _ranking_array(score: pd.DataFrame, dtype) -> np.ndarray:
+    """
+    Score values as an ndarray of the requested ranking dtype. An opt-in float32 key halves the
+    bytes moved by sorting; inputs whose magnitude would overflow float32 stay in float64.
+    """
+    S = score.to_numpy(dtype=np.float64)
+    if np.dtype(dtype) == np.float32:
+        finite = np.abs(S[np.isfinite(S)])
+        if finite.size and finite.max() > np.finfo(np.float32).max:
+            return S
+    return S.astype(dtype, copy=False)
+
+
+def _stable_top_k(keys: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k smallest keys in the order of np.argsort(keys, kind="stable")[:k].
+
+    np.partition finds the k-th key in O(n); only keys up to it are sorted. All keys tied with
+    the k-th one are kept in the sort, so ties at the boundary resolve exactly as a full stable
+    sort would.
+    """
+    n = keys.size
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k >= n:
+        return np.argsort(keys, kind="stable")
+    kth = np.partition(keys, k - 1)[k - 1]
+    head = np.flatnonzero(keys <= kth)
+    return head[np.argsort(keys[head], kind="stable")][:k]
+
+
+def _n_uniform_fit(budget: float, n: int) -> int:
+    """Number of unit-cost cells that fit in budget, capped at n."""
+    if budget >= n:
+        return n
+    # NaN or negative budgets fit nothing, as in the scan
+    return int(np.floor(budget)) if budget >= 0 else 0
+
 
 def greedy_select_under_budget(
     score: pd.DataFrame,
     cost: Optional[pd.DataFrame] = None,
     budget: float = np.inf,
     return_selected_mask: bool = False,
+    dtype=np.float64,
 ) -> Tuple[List[Tuple[str, str]], float]:
     """
     Greedy selection of cells sorted by score descending, subject to a total cost budget.
@@ -32,6 +78,11 @@ def greedy_select_under_budget(
         Total cost budget. Selection stops when next cell would exceed budget.
     return_selected_mask :
         If True, returns (selected_list, total_cost, mask_df) where mask_df is boolean DataFrame.
+    dtype :
+        Floating dtype used to rank scores (float64 by default). np.float32 halves the bytes
+        moved by sorting, but scores that round to the same float32 value are then ordered by
+        position, so near-ties may pick different cells. Costs and the returned total are always
+        accumulated in float64.
 
     Returns
     -------
@@ -39,35 +90,79 @@ def greedy_select_under_budget(
       - selected_cells: list of tuples (a_level, b_level) in selection order
       - total_cost: sum of costs of selected cells
     """
+    S = _ranking_array(score, dtype)
+    flat_s = S.ravel()
+    rest = np.flatnonzero(~np.isnan(flat_s))
+
     if cost is None:
-        cost = pd.DataFrame(1.0, index=score.index, columns=score.columns)
-
-    # Flatten
-    flat = []
-    for a in score.index:
-        for b in score.columns:
-            val = score.loc[a, b]
-            c = float(cost.loc[a, b]) if (a in cost.index and b in cost.columns) else 1.0
-            flat.append((a, b, float(val), c))
-    # Sort by score descending
-    flat_sorted = sorted(flat, key=lambda x: (-np.nan_to_num(x[2], -np.inf), x[3]))
-    selected = []
-    total_cost = 0.0
-    mask = pd.DataFrame(False, index=score.index, columns=score.columns)
-    for a, b, val, c in flat_sorted:
-        if np.isnan(val):
-            continue
-        if total_cost + c <= budget:
-            selected.append((a, b))
-            total_cost += c
-            mask.loc[a, b] = True
-        else:
-            continue
+        # uniform unit costs: the selection is simply the best floor(budget) cells in order
+        n_take = _n_uniform_fit(budget, rest.size)
+        take = rest[_stable_top_k(-flat_s[rest], n_take)]
+        total_cost = float(n_take)
+    else:
+        # cells missing from the cost table cost 1.0
+        C = cost.reindex(index=score.index, columns=score.columns, fill_value=1.0).to_numpy(dtype=np.float64)
+        take, total_cost = _greedy_scan(flat_s, C.ravel(), rest, budget)
+
+    rows, cols = np.unravel_index(take, S.shape)
+    selected = list(zip(score.index[rows].tolist(), score.columns[cols].tolist()))
     if return_selected_mask:
+        mask_arr = np.zeros(S.shape, dtype=bool)
+        mask_arr.flat[take] = True
+        mask = pd.DataFrame(mask_arr, index=score.index, columns=score.columns)
         return selected, total_cost, mask
     return selected, total_cost
 
 
+def _greedy_take_py(costs: np.ndarray, budget: float, total: float) -> Tuple[np.ndarray, float]:
+    """Pure-Python version of the _greedy_take kernel (used when numba is unavailable)."""
+    fits = []
+    for c in costs.tolist():
+        ok = total + c <= budget
+        if ok:
+            total += c
+        fits.append(ok)
+    return np.asarray(fits, dtype=bool), total
+
+
+def _greedy_scan(flat_s: np.ndarray, flat_c: np.ndarray, rest: np.ndarray, budget: float):
+    """
+    Greedy budgeted scan over the valid flat positions `rest` in (score desc, cost asc,
+    row-major) order. Returns (taken positions, total cost).
+    """
+    # Only the head of the (score desc, cost asc) order is usually scanned before the budget
+    # runs out, so sort a score-partitioned block of about 2 * budget / median(cost) cells
+    # and move on to the next (doubled) block only while some remaining cell could still fit.
+    n_block = rest.size
+    if np.isfinite(budget) and rest.size:
+        med = float(np.median(flat_c[rest]))
+        if med > 0:
+            n_block = int(min(rest.size, max(1.0, 2.0 * budget / med + 1.0)))
+
+    # skip cells that do not fit and keep scanning: a cheaper cell further down may still fit
+    take = []
+    total_cost = 0.0
+    while rest.size:
+        neg_s = -flat_s[rest]
+        if n_block < rest.size:
+            # the block holds every cell tied with the cut-off score, so it is an exact prefix
+            in_block = neg_s <= np.partition(neg_s, n_block - 1)[n_block - 1]
+        else:
+            in_block = np.ones(rest.size, dtype=bool)
+        block = rest[in_block]
+        # score descending, then cost ascending; lexsort is stable, so remaining ties keep row-major order
+        order = block[np.lexsort((flat_c[block], neg_s[in_block]))]
+        scan = _greedy_take if _greedy_take is not None else _greedy_take_py
+        fits, total_cost = scan(np.ascontiguousarray(flat_c[order]), float(budget), total_cost)
+        take.append(order[fits])
+        rest = rest[~in_block]
+        if not rest.size or total_cost + flat_c[rest].min() > budget:
+            break
+        n_block *= 2
+    take = np.concatenate(take) if take else np.empty(0, dtype=np.intp)
+    return take, float(total_cost)
+
+
 def exhaustive_best_k(
     score: pd.DataFrame,
     cost: Optional[pd.DataFrame] = None,
@@ -93,30 +188,42 @@ def exhaustive_best_k(
     -------
     best_selection, best_score_sum
     """
-    import itertools
-
-    flat = []
-    indices = []
-    for a in score.index:
-        for b in score.columns:
-            val = score.loc[a, b]
-            if np.isnan(val):
-                continue
-            flat.append(((a, b), float(val), float(cost.loc[a, b]) if cost is not None else 1.0))
-            indices.append((a, b))
-    best_score = -np.inf
-    best_sel = []
-    # quick path: if number of available cells is small, enumerate
-    for comb in itertools.combinations(flat, r=k):
-        sel = [c[0] for c in comb]
-        ssum = sum(c[1] for c in comb)
-        csum = sum(c[2] for c in comb)
-        if csum <= budget and ssum > best_score:
-            best_score = ssum
-            best_sel = sel
+    S = score.to_numpy(dtype=np.float64)
+    if cost is None:
+        C = np.ones(S.shape)
+    else:
+        C = cost.reindex(index=score.index, columns=score.columns, fill_value=1.0).to_numpy(dtype=np.float64)
+    # candidate cells: non-NaN scores in row-major order
+    cand = np.flatnonzero(~np.isnan(S.ravel()))
+    vals = np.ascontiguousarray(S.ravel()[cand])
+    costs = np.ascontiguousarray(C.ravel()[cand])
+
+    if _exhaustive_best_k is not None and k > 0:
+        kernel = _exhaustive_best_k
+        if (
+            k <= len(cand)
+            and math.comb(len(cand), int(k)) >= _PARALLEL_MIN_COMBINATIONS
+            and _num_threads() > 1
+        ):
+            kernel = _exhaustive_best_k_parallel
+        best_score, best_idx = kernel(vals, costs, int(k), float(budget))
+        best_pos = best_idx.tolist()
+    else:
+        import itertools
+
+        best_score = -np.inf
+        best_pos = []
+        # quick path: if number of available cells is small, enumerate
+        for comb in itertools.combinations(range(len(cand)), r=k):
+            ssum = sum(vals[i] for i in comb)
+            csum = sum(costs[i] for i in comb)
+            if csum <= budget and ssum > best_score:
+                best_score = ssum
+                best_pos = list(comb)
     if best_score == -np.inf:
         return [], 0.0
-    return best_sel, float(best_score)
+    rows, cols = np.unravel_index(cand[best_pos], S.shape)
+    return list(zip(score.index[rows].tolist(), score.columns[cols].tolist())), float(best_score)
 
 
 def beam_search_pair_selection(
@@ -125,6 +232,7 @@ def beam_search_pair_selection(
     budget: float = np.inf,
     beam_width: int = 5,
     max_iters: Optional[int] = None,
+    dtype=np.float64,
 ) -> Tuple[List[Tuple[str, str]], float]:
     """
     Beam search to greedily compose a small selection of cells that approximately maximize total score.
@@ -142,58 +250,84 @@ def beam_search_pair_selection(
         Number of partial solutions to keep per iteration.
     max_iters :
         Maximum number of cells to select. If None, upper bound is total number of non-NaN cells.
+    dtype :
+        Floating dtype of the key that orders candidate cells (float64 by default; np.float32 may
+        order near-ties by position). Partial score sums, costs and the returned score sum are
+        always accumulated in float64.
 
     Returns
     -------
     best_selection, best_score_sum
     """
-    if cost is None:
-        cost = pd.DataFrame(1.0, index=score.index, columns=score.columns)
+    S = score.to_numpy(dtype=np.float64)
+    key = _ranking_array(score, dtype).ravel()
 
-    # Flatten candidate list
-    candidates = []
-    for a in score.index:
-        for b in score.columns:
-            val = score.loc[a, b]
-            if np.isnan(val):
-                continue
-            candidates.append(((a, b), float(val), float(cost.loc[a, b])))
+    # Candidate cells (non-NaN), sorted by score descending for deterministic behavior
+    flat_s = S.ravel()
+    cand = np.flatnonzero(~np.isnan(flat_s))
+    cand = cand[np.argsort(-key[cand], kind="stable")]
+    # partial sums use the float64 scores so the returned total does not depend on dtype
+    val = flat_s[cand]
 
-    # sort candidates by score descending for deterministic behavior
-    candidates = sorted(candidates, key=lambda x: -x[1])
-
-    total_cells = len(candidates)
+    total_cells = len(cand)
     if max_iters is None:
         max_iters = total_cells
+    if cost is None:
+        # uniform unit costs: step t is feasible iff t + 1 <= budget, so bound the steps instead
+        cost_arr = None
+        max_iters = min(int(max_iters), _n_uniform_fit(budget, total_cells))
+    else:
+        C = cost.reindex(index=score.index, columns=score.columns, fill_value=1.0).to_numpy(dtype=np.float64)
+        cost_arr = C.ravel()[cand]
 
-    # Beam entries: tuple (selected_list, total_score, total_cost)
-    beam = [([], 0.0, 0.0)]
-    best = ([], 0.0, 0.0)
+    # Beam state as arrays: paths[i] lists candidate positions in selection order,
+    # member[i] is the same selection as a boolean mask over candidates
+    paths = np.empty((1, 0), dtype=np.intp)
+    member = np.zeros((1, total_cells), dtype=bool)
+    ssum = np.zeros(1)
+    csum = np.zeros(1)
+    best_path, best_sum = paths[0], 0.0
 
     for _iter in range(int(max_iters)):
-        new_beam = []
-        for sel, ssum, csum in beam:
-            # try adding any candidate not already in sel
-            for cand, val, c in candidates:
-                if cand in sel:
-                    continue
-                new_cost = csum + c
-                if new_cost > budget:
-                    continue
-                new_sel = sel + [cand]
-                new_sum = ssum + val
-                new_beam.append((new_sel, new_sum, new_cost))
-                # track best
-                if new_sum > best[1]:
-                    best = (new_sel, new_sum, new_cost)
-        if not new_beam:
+        # expand every beam entry by every feasible candidate not already in it; flat (entry, candidate)
+        # order is the order in which the expansions used to be generated
+        feasible = ~member
+        if cost_arr is not None:
+            feasible &= csum[:, None] + cost_arr[None, :] <= budget
+        flat = np.flatnonzero(feasible)
+        if flat.size == 0:
             break
-        # keep top-k partial solutions by score
-        new_beam_sorted = sorted(new_beam, key=lambda x: -x[1])
-        beam = new_beam_sorted[:beam_width]
+        b_idx, c_idx = np.divmod(flat, total_cells)
+        new_sum = ssum[b_idx] + val[c_idx]
+        # track best: first expansion reaching the step maximum, if it improves on the best so far
+        top = int(np.argmax(new_sum))
+        if new_sum[top] > best_sum:
+            best_path = np.append(paths[b_idx[top]], c_idx[top])
+            best_sum = float(new_sum[top])
+        # keep top-k partial solutions by score (stable, so ties keep generation order), counting each
+        # selection once: a set of t + 1 cells is reachable from at most t + 1 beam entries, so the
+        # best beam_width * (t + 1) expansions always hold beam_width distinct selections if there are any
+        keep = []
+        seen = set()
+        for j in _stable_top_k(-new_sum, beam_width * (_iter + 1)).tolist():
+            key = frozenset(paths[b_idx[j]].tolist()).union((int(c_idx[j]),))
+            if key not in seen:
+                seen.add(key)
+                keep.append(j)
+                if len(keep) == beam_width:
+                    break
+        keep = np.asarray(keep, dtype=np.intp)
+        b_idx, c_idx = b_idx[keep], c_idx[keep]
+        paths = np.concatenate([paths[b_idx], c_idx[:, None]], axis=1)
+        member = member[b_idx]
+        member[np.arange(len(keep)), c_idx] = True
+        ssum = new_sum[keep]
+        if cost_arr is not None:
+            csum = csum[b_idx] + cost_arr[c_idx]
     # return best found
-    if best[1] <= 0.0:
+    if best_sum <= 0.0:
         # fallback to greedy single selection if nothing selected
         sel, sc = greedy_select_under_budget(score, cost=cost, budget=budget)
         return sel, sc
-    return best[0], float(best[1])
+    rows, cols = np.unravel_index(cand[best_path], S.shape)
+    return list(zip(score.index[rows].tolist(), score.columns[cols].tolist())), best_sum
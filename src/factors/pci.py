@@ -9,26 +9,19 @@ from typing import Tuple, Optional
 import numpy as np
 import pandas as pd
 
+from .effects import _interaction_residuals
+
 
 def interaction_matrix_from_cell_means(cell_means: pd.DataFrame) -> pd.DataFrame:
     """
     Compute the two-way interaction residuals matrix:
       I_{ij} = cell_mean_{ij} - row_mean_i - col_mean_j + overall_mean
 
-    Returns a DataFrame with same index/columns as cell_means.
+    Returns a DataFrame with same index/columns as cell_means. Means skip missing cells and
+    missing cells stay NaN in the result.
     """
-    overall = float(np.nanmean(cell_means.values))
-    row_means = cell_means.mean(axis=1)
-    col_means = cell_means.mean(axis=0)
-    I = cell_means.copy()
-    for i in cell_means.index:
-        for j in cell_means.columns:
-            mij = cell_means.loc[i, j]
-            if np.isnan(mij):
-                I.loc[i, j] = np.nan
-            else:
-                I.loc[i, j] = mij - row_means.loc[i] - col_means.loc[j] + overall
-    return I
+    I = _interaction_residuals(cell_means.to_numpy(dtype=np.float64))
+    return pd.DataFrame(I, index=cell_means.index, columns=cell_means.columns, copy=False)
 
 
 def pci_simple(
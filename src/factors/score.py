@@ -8,10 +8,77 @@
 
 from __future__ import annotations
 
-from typing import Optional, Tuple
+import os
+import warnings
+from typing import Optional, Tuple, Union
 import numpy as np
 import pandas as pd
 
+try:
+    import numexpr as ne  # optional dependency
+except Exception:  # pragma: no cover - numexpr optional
+    ne = None
+
+# compute_risk_adjusted_score evaluates tables of at least this many cells in one numexpr pass
+_NUMEXPR_MIN_SIZE = 1 << 16
+
+# .npy replicate matrices (and large dict inputs) are reduced in row blocks of about this many
+# bytes, so neither a memory map nor a second full in-memory copy is materialized
+_REDUCE_BLOCK_BYTES = 64 << 20
+
+
+def _aggregate_rows(arr: np.ndarray, aggfunc: str) -> np.ndarray:
+    """Row-wise reduction of a dense (n_cells, n_reps) replicate matrix."""
+    if aggfunc == "std":
+        return np.std(arr, ddof=1, axis=1)
+    if aggfunc == "se":
+        return _std_to_se(np.std(arr, ddof=1, axis=1), arr.shape[1])
+    if aggfunc == "iqr":
+        return np.subtract(*np.percentile(arr, [75, 25], axis=1))
+    # try to use numpy ufunc name
+    fun = getattr(np, aggfunc, None)
+    if fun is None:
+        raise ValueError(f"Unknown aggfunc {aggfunc}")
+    return fun(arr, axis=1)
+
+
+def _std_to_se(std, n_reps):
+    """Standard error of the replicate mean from the replicate standard deviation (aggfunc="se")."""
+    return std / np.sqrt(n_reps)
+
+
+def _scatter_grid(vals, keys_a, keys_b, levels_a, levels_b) -> np.ndarray:
+    """
+    Place per-cell values into a (levels_a x levels_b) array by integer code instead of building
+    a Series and unstacking it; cells outside the given levels are ignored, missing cells are NaN.
+    """
+    result = np.full((len(levels_a), len(levels_b)), np.nan)
+    rows = pd.Index(levels_a).get_indexer(keys_a)
+    cols = pd.Index(levels_b).get_indexer(keys_b)
+    ok = (rows >= 0) & (cols >= 0)
+    result[rows[ok], cols[ok]] = np.asarray(vals, dtype=float)[ok]
+    return result
+
+
+def _aggregate_rows_blocked(arr: np.ndarray, aggfunc: str) -> np.ndarray:
+    """
+    _aggregate_rows over blocks of rows, so that a memory-mapped matrix is streamed from disk
+    and only one block (plus the reduction temporaries) is resident at a time.
+    """
+    n_cells, n_reps = arr.shape
+    step = _block_rows(n_reps, arr.itemsize)
+    if step >= n_cells:
+        return np.asarray(_aggregate_rows(arr, aggfunc), dtype=float)
+    out = np.empty(n_cells)
+    for start in range(0, n_cells, step):
+        out[start : start + step] = _aggregate_rows(arr[start : start + step], aggfunc)
+    return out
+
+
+def _block_rows(n_reps: int, itemsize: int = 8) -> int:
+    """Number of replicate rows per reduction block."""
+    return max(1, _REDUCE_BLOCK_BYTES // max(1, n_reps * itemsize))
+
 
 def build_f_tilde_from_cell_means(cell_means: pd.DataFrame) -> pd.DataFrame:
     """
@@ -32,7 +99,7 @@ def build_f_tilde_from_cell_means(cell_means: pd.DataFrame) -> pd.DataFrame:
 
 
 def compute_uncertainty_from_bootstrap(
-    bootstrap_values: dict,
+    bootstrap_values: Union[dict, pd.DataFrame, str, os.PathLike],
     levels_a: Optional[list] = None,
     levels_b: Optional[list] = None,
     aggfunc: str = "std",
@@ -44,11 +111,14 @@ def compute_uncertainty_from_bootstrap(
     ----------
     bootstrap_values :
         Mapping (a_level, b_level) -> 1D array-like of bootstrap replicate estimates
-        or a pandas.DataFrame with MultiIndex (a_level, b_level) and columns for replicates.
+        or a pandas.DataFrame with MultiIndex (a_level, b_level) and columns for replicates,
+        or the path of a .npy file holding an (n_cells, n_reps) replicate matrix whose rows are
+        the cells in row-major (levels_a x levels_b) order. The file is memory-mapped and
+        reduced in row blocks, so it is never loaded whole.
     levels_a :
-        Optional ordered list of A levels to use for the index.
+        Optional ordered list of A levels to use for the index (required for a .npy path).
     levels_b :
-        Optional ordered list of B levels to use for the columns.
+        Optional ordered list of B levels to use for the columns (required for a .npy path).
     aggfunc :
         Aggregation function name: "std" for standard deviation, "se" for standard error,
         "iqr" for interquartile range, or a custom callable name supported by numpy.
@@ -58,33 +128,37 @@ def compute_uncertainty_from_bootstrap(
     pandas.DataFrame
         DataFrame aligned with (levels_a x levels_b) containing uncertainty measures.
     """
+    # If input is the path of a replicate matrix written by a bootstrap step
+    if isinstance(bootstrap_values, (str, os.PathLike)):
+        if levels_a is None or levels_b is None:
+            raise ValueError("levels_a and levels_b are required when bootstrap_values is a .npy path")
+        mm = np.load(bootstrap_values, mmap_mode="r")
+        if mm.ndim != 2 or mm.shape[0] != len(levels_a) * len(levels_b):
+            raise ValueError(
+                f"expected an array of shape ({len(levels_a) * len(levels_b)}, n_reps), got {mm.shape}"
+            )
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            vals = _aggregate_rows_blocked(mm, aggfunc)
+        return pd.DataFrame(vals.reshape(len(levels_a), len(levels_b)), index=levels_a, columns=levels_b)
+
     # If input is a DataFrame with MultiIndex
-    if isinstance(bootstrap_values, pd.DataFrame) and isinstance(bootstrap_values.index, pd.MultiIndex):
+    elif isinstance(bootstrap_values, pd.DataFrame) and isinstance(bootstrap_values.index, pd.MultiIndex):
         # assume columns are replicate indices
-        df = bootstrap_values.copy()
+        idx = bootstrap_values.index
         if levels_a is None:
-            levels_a = df.index.get_level_values(0).unique().tolist()
+            levels_a = idx.get_level_values(0).unique().tolist()
         if levels_b is None:
-            levels_b = df.index.get_level_values(1).unique().tolist()
-
-        agg_map = {
-            "std": lambda arr: np.std(arr, ddof=1, axis=1),
-            "se": lambda arr: np.std(arr, ddof=1, axis=1) / np.sqrt(arr.shape[1]),
-            "iqr": lambda arr: np.subtract(*np.percentile(arr, [75, 25], axis=1)),
-        }
+            levels_b = idx.get_level_values(1).unique().tolist()
 
-        if aggfunc in agg_map:
-            vals = agg_map[aggfunc](df.values)
-        else:
-            # try to use numpy ufunc name
-            fun = getattr(np, aggfunc, None)
-            if fun is None:
-                raise ValueError(f"Unknown aggfunc {aggfunc}")
-            vals = fun(df.values, axis=1)
+        vals = _aggregate_rows(bootstrap_values.to_numpy(dtype=float), aggfunc)
 
-        ser = pd.Series(vals, index=df.index)
-        out = ser.unstack(level=1).reindex(index=levels_a, columns=levels_b)
-        return out
+        result = _scatter_grid(vals, idx.get_level_values(0), idx.get_level_values(1), levels_a, levels_b)
+        return pd.DataFrame(
+            result,
+            index=pd.Index(levels_a, name=idx.names[0]),
+            columns=pd.Index(levels_b, name=idx.names[1]),
+        )
 
     # If input is dict-like mapping (a_level, b_level) -> array
     else:
@@ -94,21 +168,92 @@ def compute_uncertainty_from_bootstrap(
             levels_a = sorted({k[0] for k in keys})
             levels_b = sorted({k[1] for k in keys})
 
-        result = pd.DataFrame(index=levels_a, columns=levels_b, dtype=float)
-        for (a, b), arr in bootstrap_values.items():
-            arr = np.asarray(arr, dtype=float)
-            if aggfunc == "std":
-                result.loc[a, b] = float(np.std(arr, ddof=1))
-            elif aggfunc == "se":
-                result.loc[a, b] = float(np.std(arr, ddof=1) / np.sqrt(arr.size))
-            elif aggfunc == "iqr":
-                result.loc[a, b] = float(np.subtract(*np.percentile(arr, [75, 25])))
+        keys = list(bootstrap_values.keys())
+        if not keys:
+            return pd.DataFrame(np.full((len(levels_a), len(levels_b)), np.nan), index=levels_a, columns=levels_b)
+
+        arrays = [np.asarray(bootstrap_values[k], dtype=float).ravel() for k in keys]
+        lengths = np.array([a.size for a in arrays])
+        ragged = bool((lengths != lengths[0]).any())
+
+        with warnings.catch_warnings():
+            # single-replicate cells give NaN (ddof=1), as before
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            if not ragged:
+                # stack (and reduce) a block of rows at a time, so large inputs are not copied
+                # into one (n_cells, n_reps) array next to the arrays already held in the dict
+                step = _block_rows(int(lengths[0]))
+                vals = np.concatenate(
+                    [_aggregate_rows(np.stack(arrays[i : i + step]), aggfunc) for i in range(0, len(arrays), step)]
+                )
             else:
-                fun = getattr(np, aggfunc, None)
-                if fun is None:
-                    raise ValueError(f"Unknown aggfunc {aggfunc}")
-                result.loc[a, b] = float(fun(arr))
-        return result
+                # pad ragged cells with NaN into one (n_cells, max_reps) array
+                arr2d = np.full((len(arrays), int(lengths.max())), np.nan)
+                for i, a in enumerate(arrays):
+                    arr2d[i, : a.size] = a
+                if aggfunc == "std":
+                    vals = np.nanstd(arr2d, ddof=1, axis=1)
+                elif aggfunc == "se":
+                    vals = _std_to_se(np.nanstd(arr2d, ddof=1, axis=1), lengths)
+                elif aggfunc == "iqr":
+                    vals = np.subtract(*np.nanpercentile(arr2d, [75, 25], axis=1))
+                else:
+                    fun = getattr(np, aggfunc, None)
+                    if fun is None:
+                        raise ValueError(f"Unknown aggfunc {aggfunc}")
+                    nan_fun = getattr(np, "nan" + aggfunc, None)
+                    if nan_fun is not None:
+                        # NaN-aware reduction over the padded rows (nanvar, nanmedian, nanmax, ...)
+                        vals = nan_fun(arr2d, axis=1)
+                    else:
+                        vals = np.array([float(fun(a)) for a in arrays])
+
+        result = _scatter_grid(vals, [k[0] for k in keys], [k[1] for k in keys], levels_a, levels_b)
+        return pd.DataFrame(result, index=levels_a, columns=levels_b)
+
+
+def compute_uncertainty_from_bootstrap_ci(
+    ci_df: pd.DataFrame,
+    levels_a: list,
+    levels_b: list,
+    n_reps: int,
+    aggfunc: str = "se",
+) -> pd.DataFrame:
+    """
+    Per-cell uncertainty from bootstrap summaries instead of the raw replicates.
+
+    Takes the output of bootstrap.compute_bootstrap_ci or compute_bootstrap_ci_streaming, whose
+    "se" column is the standard deviation of each cell's replicates, so the streaming pipeline
+    gets the same values as compute_uncertainty_from_bootstrap(replicates, aggfunc=...) without
+    keeping the replicates.
+
+    Parameters
+    ----------
+    ci_df :
+        DataFrame indexed by (a_level, b_level) with an "se" column.
+    levels_a, levels_b :
+        Ordered levels for the rows and columns of the result.
+    n_reps :
+        Number of bootstrap replicates per cell.
+    aggfunc :
+        "std" for the replicate standard deviation or "se" for the standard error of the
+        replicate mean (std / sqrt(n_reps)); other aggregations need the replicates.
+
+    Returns
+    -------
+    pandas.DataFrame
+        DataFrame aligned with (levels_a x levels_b); cells without a summary are NaN.
+    """
+    std = ci_df["se"].to_numpy(dtype=float)
+    if aggfunc == "std":
+        vals = std
+    elif aggfunc == "se":
+        vals = _std_to_se(std, n_reps)
+    else:
+        raise ValueError(f"aggfunc {aggfunc!r} needs the raw replicates; use compute_uncertainty_from_bootstrap")
+    idx = ci_df.index
+    result = _scatter_grid(vals, idx.get_level_values(0), idx.get_level_values(1), levels_a, levels_b)
+    return pd.DataFrame(result, index=levels_a, columns=levels_b)
 
 
 def normalize_costs(costs: pd.DataFrame, eps: float = 1e-9) -> pd.DataFrame:
@@ -128,11 +273,28 @@ def normalize_costs(costs: pd.DataFrame, eps: float = 1e-9) -> pd.DataFrame:
     pandas.DataFrame
         Normalized cost matrix in [0, 1].
     """
-    cm = costs.copy().astype(float)
-    maxc = float(np.nanmax(cm.values)) if cm.size > 0 else 0.0
+    cm = costs.to_numpy(dtype=np.float64, copy=True)
+    return pd.DataFrame(_normalize_costs_inplace(cm, eps), index=costs.index, columns=costs.columns)
+
+
+def _normalize_costs_inplace(arr: np.ndarray, eps: float = 1e-9) -> np.ndarray:
+    """Array core of normalize_costs; overwrites and returns arr (a float64 array)."""
+    maxc = float(np.nanmax(arr)) if arr.size > 0 else 0.0
     if maxc <= eps:
-        return cm.fillna(0.0)
-    return cm / maxc
+        arr[np.isnan(arr)] = 0.0
+    else:
+        arr /= maxc
+    return arr
+
+
+def _aligned_values(frame: pd.DataFrame, like: pd.DataFrame) -> np.ndarray:
+    """
+    frame as a float64 array aligned to the index/columns of like (missing cells are NaN).
+    The reindex is skipped when the labels already match; the result may share memory with frame.
+    """
+    if frame.index.equals(like.index) and frame.columns.equals(like.columns):
+        return frame.to_numpy(dtype=np.float64)
+    return frame.reindex(index=like.index, columns=like.columns).to_numpy(dtype=np.float64)
 
 
 def compute_risk_adjusted_score(
@@ -142,6 +304,7 @@ def compute_risk_adjusted_score(
     kappa: float = 1.0,
     rho: float = 0.0,
     normalize_costs_flag: bool = True,
+    dtype=np.float64,
 ) -> pd.DataFrame:
     """
     Compute a risk-adjusted score for each cell:
@@ -161,23 +324,68 @@ def compute_risk_adjusted_score(
         Cost weight.
     normalize_costs_flag :
         If True, normalize costs to [0,1] before applying rho.
+    dtype :
+        Floating dtype of the result. np.float32 halves the memory of large score tables when the
+        scores are only ranked downstream (see factors.optimizer).
 
     Returns
     -------
     pandas.DataFrame
         DataFrame of scores aligned with input.
     """
-    means = cell_means.copy().astype(float)
-    if uncertainty is None:
-        uncertainty = pd.DataFrame(0.0, index=means.index, columns=means.columns)
-    else:
-        uncertainty = uncertainty.reindex(index=means.index, columns=means.columns).fillna(0.0).astype(float)
+    if ne is not None and cell_means.size >= _NUMEXPR_MIN_SIZE:
+        out = _risk_adjusted_score_numexpr(cell_means, uncertainty, cost, kappa, rho, normalize_costs_flag)
+        return pd.DataFrame(out.astype(dtype, copy=False), index=cell_means.index, columns=cell_means.columns)
 
-    if cost is None:
-        cost_norm = pd.DataFrame(0.0, index=means.index, columns=means.columns)
-    else:
-        cost = cost.reindex(index=means.index, columns=means.columns).astype(float)
-        cost_norm = normalize_costs(cost) if normalize_costs_flag else cost
+    # one output buffer and one scratch buffer instead of a chain of aligned DataFrame operations
+    out = cell_means.to_numpy(dtype=np.float64, copy=True)
+    buf = np.empty_like(out)
+    if uncertainty is not None:
+        np.copyto(buf, _aligned_values(uncertainty, cell_means))
+        buf[np.isnan(buf)] = 0.0
+        buf *= kappa
+        out -= buf
+
+    if cost is not None:
+        # missing costs stay NaN (and so do their scores) unless every cost is zero
+        np.copyto(buf, _aligned_values(cost, cell_means))
+        if normalize_costs_flag:
+            _normalize_costs_inplace(buf)
+        buf *= rho
+        out -= buf
 
-    score = means - kappa * uncertainty - rho * cost_norm
-    return score
+    return pd.DataFrame(out.astype(dtype, copy=False), index=cell_means.index, columns=cell_means.columns)
+
+
+def _risk_adjusted_score_numexpr(
+    cell_means: pd.DataFrame,
+    uncertainty: Optional[pd.DataFrame],
+    cost: Optional[pd.DataFrame],
+    kappa: float,
+    rho: float,
+    normalize_costs_flag: bool,
+    eps: float = 1e-9,
+) -> np.ndarray:
+    """
+    compute_risk_adjusted_score as a single multi-threaded numexpr pass; missing uncertainty is
+    treated as zero and cost normalization is folded into the expression.
+    """
+    local = {"M": cell_means.to_numpy(dtype=np.float64), "kappa": float(kappa), "rho": float(rho)}
+    expr = "M"
+    if uncertainty is not None:
+        local["U"] = _aligned_values(uncertainty, cell_means)
+        expr += " - kappa * where(U != U, 0.0, U)"
+    if cost is not None:
+        C = _aligned_values(cost, cell_means)
+        local["C"] = C
+        maxc = float(np.nanmax(C)) if (normalize_costs_flag and C.size > 0) else 0.0
+        if not normalize_costs_flag:
+            expr += " - rho * C"
+        elif maxc <= eps:
+            expr += " - rho * where(C != C, 0.0, C)"
+        else:
+            local["maxc"] = maxc
+            expr += " - rho * (C / maxc)"
+    out = np.empty(local["M"].shape)
+    ne.evaluate(expr, local_dict=local, out=out)
+    return out
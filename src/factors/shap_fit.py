@@ -4,23 +4,45 @@
 #
 # The implementation is intentionally straightforward: it constructs one-hot encodings
 # for factor levels and interaction terms, then fits ridge-regularized least squares.
-# This is suitable for small-to-moderate numbers of factor levels; for very large cardinality
-# consider level grouping or sparse solvers.
+# The design is stored as a sparse CSR matrix (at most four non-zeros per row) and, by default,
+# solved with sparse conjugate gradients, so memory grows with n_samples rather than n_a * n_b.
+# solver="anova" is an opt-in closed form from per-cell means, with effect-coded coefficients
+# and no model object or design matrix.
 
 from __future__ import annotations
 
+import functools
+import hashlib
+import os
+import warnings
+from collections import OrderedDict
+
 import numpy as np
 import pandas as pd
 from typing import Optional, Tuple, Dict
+import scipy.sparse as sp
+from scipy.linalg import cho_factor, cho_solve
 import sklearn.linear_model as lm
+import joblib
+
+from .utils import _encode_factor
 
 try:
     import shap  # optional dependency
 except Exception:  # pragma: no cover - shap optional
     shap = None
 
+# solver="ridge" solves problems with at most this many (A, B) cells (<= 25 design columns)
+# exactly on the dense Gram matrix instead of iterating conjugate gradients
+_SMALL_CELLS_MAX = 16
+
 
-def compute_shap_explainer_values(model, X: pd.DataFrame, background: Optional[pd.DataFrame] = None):
+def compute_shap_explainer_values(
+    model,
+    X: pd.DataFrame,
+    background: Optional[pd.DataFrame] = None,
+    cache_dir: Optional[str] = None,
+):
     """
     Compute SHAP values using shap.Explainer where available.
 
@@ -35,6 +57,12 @@ def compute_shap_explainer_values(model, X: pd.DataFrame, background: Optional[p
     background :
         Optional background dataset for explainer; if None, X will be used as the background
         (safe for small toy examples / tests).
+    cache_dir :
+        Optional directory for an on-disk joblib.Memory cache of the results; defaults to the
+        FACTORS_CACHE_DIR environment variable. Caching is off when neither is set, when the
+        directory is not writable, or when the model cannot be hashed (e.g. a local lambda).
+        Entries are keyed on a hash of the model (for plain functions also their bytecode,
+        defaults and closed-over values) and blake2b digests of X and background.
 
     Returns
     -------
@@ -57,6 +85,16 @@ def compute_shap_explainer_values(model, X: pd.DataFrame, background: Optional[p
         else:
             raise TypeError("Model must be callable or implement a callable 'predict' or 'forward' method.")
 
+    cache_dir = cache_dir if cache_dir is not None else os.environ.get("FACTORS_CACHE_DIR")
+    if cache_dir:
+        key = _shap_cache_key(model, X, background)
+        cached = _shap_memory(str(cache_dir)) if key is not None else None
+        if cached is not None:
+            return cached(key, model_callable, X, background)
+    return _explain(model_callable, X, background)
+
+
+def _explain(model_callable, X: pd.DataFrame, background: Optional[pd.DataFrame]):
     # Choose background: if provided use it, otherwise use X (safe fallback for tests / small data)
     masker = background if background is not None else X
 
@@ -70,46 +108,375 @@ def compute_shap_explainer_values(model, X: pd.DataFrame, background: Optional[p
 
     return expected_value, shap_values
 
+
+def _explain_keyed(key: str, model_callable, X: pd.DataFrame, background: Optional[pd.DataFrame]):
+    """_explain with an explicit cache key; joblib.Memory hashes only `key`."""
+    return _explain(model_callable, X, background)
+
+
+def _frame_digest(frame: Optional[pd.DataFrame]) -> str:
+    """blake2b digest of a frame's values, shape, dtypes and column labels."""
+    if frame is None:
+        return "none"
+    h = hashlib.blake2b(digest_size=16)
+    values = np.ascontiguousarray(np.asarray(frame))
+    h.update(repr((values.shape, str(values.dtype), list(getattr(frame, "columns", [])))).encode())
+    if values.dtype == object:
+        h.update(joblib.hash(values).encode())
+    else:
+        h.update(values.tobytes())
+    return h.hexdigest()
+
+
+def _code_fingerprint(code) -> tuple:
+    """Bytecode, constants and names of a code object, recursing into nested code objects."""
+    consts = tuple(_code_fingerprint(c) if hasattr(c, "co_code") else c for c in code.co_consts)
+    return (code.co_code, consts, code.co_names)
+
+
+def _callable_token(model) -> tuple:
+    """
+    Code token for plain functions, lambdas and bound methods. joblib.hash pickles module-level
+    functions by name only, so their bytecode, defaults and closed-over values are hashed as well;
+    a closure over unpicklable state makes joblib.hash fail and disables caching.
+    """
+    func = getattr(model, "__func__", model)
+    code = getattr(func, "__code__", None)
+    if code is None:
+        # estimators and other callable objects: their state is hashed by joblib.hash(model)
+        return ()
+    closure = tuple(cell.cell_contents for cell in func.__closure__ or ())
+    return (func.__module__, func.__qualname__, _code_fingerprint(code), func.__defaults__, func.__kwdefaults__, closure)
+
+
+def _shap_cache_key(model, X: pd.DataFrame, background: Optional[pd.DataFrame]) -> Optional[str]:
+    """Cache key for (model, X, background), or None when the model cannot be hashed."""
+    try:
+        model_token = joblib.hash((model, _callable_token(model)))
+    except Exception:
+        return None
+    cls = type(model)
+    return f"{cls.__module__}.{cls.__qualname__}:{model_token}:{_frame_digest(X)}:{_frame_digest(background)}"
+
+
+@functools.lru_cache(maxsize=8)
+def _shap_memory(location: str):
+    """Memory-cached _explain_keyed for a cache directory, or None if it cannot be written to."""
+    try:
+        os.makedirs(location, exist_ok=True)
+        if not os.access(location, os.W_OK):
+            raise PermissionError(location)
+    except OSError as exc:
+        warnings.warn(f"SHAP cache disabled, cannot write to {location!r}: {exc}", RuntimeWarning)
+        return None
+    memory = joblib.Memory(location=location, verbose=0)
+    return memory.cache(_explain_keyed, ignore=["model_callable", "X", "background"])
+
+
+def _factor_codes(levels) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Integer codes and sorted unique levels of one factor (missing values get code -1).
+    The order matches the dummy columns of pd.get_dummies.
+
+    Levels are sorted by value; categorical input whose categories are already in that order
+    reuses its stored codes (see utils._encode_factor) instead of hashing every value.
+    """
+    dtype = getattr(levels, "dtype", None)
+    if not (isinstance(dtype, pd.CategoricalDtype) and dtype.categories.is_monotonic_increasing):
+        levels = np.asarray(levels)
+    codes, uniq = _encode_factor(levels)
+    return codes, np.asarray(uniq)
+
+
+def _design_arrays_for_two_factors(
+    levels_a, levels_b, drop_first: bool = False
+) -> Tuple[sp.csr_matrix, list, list, list]:
+    """
+    Sparse form of the two-factor design matrix.
+    Returns (X, column_names, a_level_names, b_level_names) with X a CSR matrix laid out as
+    [Intercept | A dummies | B dummies | A x B interactions].
+
+    Every row has at most four non-zeros (intercept, one A level, one B level, one interaction),
+    so X is built directly from the level codes without materializing the dense one-hot blocks:
+    the CSR indices are the per-row column slots and indptr advances by the number of present ones.
+    """
+    a_codes, a_uniq = _factor_codes(levels_a)
+    b_codes, b_uniq = _factor_codes(levels_b)
+    if drop_first:
+        # the first level gets no dummy column: its code becomes -1 like a missing value
+        a_codes, a_uniq = a_codes - 1, a_uniq[1:]
+        b_codes, b_uniq = b_codes - 1, b_uniq[1:]
+    a_level_names = [f"A_{lvl}" for lvl in a_uniq]
+    b_level_names = [f"B_{lvl}" for lvl in b_uniq]
+    n = len(a_codes)
+    n_a, n_b = len(a_level_names), len(b_level_names)
+
+    # column of each row's non-zeros in (intercept, A, B, interaction) order, -1 where absent;
+    # the slots are already in increasing column order, so they are the CSR indices as they stand
+    has_a = a_codes >= 0
+    has_b = b_codes >= 0
+    slots = np.empty((n, 4), dtype=np.intp)
+    slots[:, 0] = 0
+    slots[:, 1] = np.where(has_a, 1 + a_codes, -1)
+    slots[:, 2] = np.where(has_b, 1 + n_a + b_codes, -1)
+    slots[:, 3] = np.where(has_a & has_b, 1 + n_a + n_b + a_codes * n_b + b_codes, -1)
+    if has_a.all() and has_b.all():
+        # every row has exactly four non-zeros
+        indptr = np.arange(0, 4 * n + 1, 4)
+        indices = slots.ravel()
+    else:
+        present = slots >= 0
+        indptr = np.zeros(n + 1, dtype=np.intp)
+        np.cumsum(present.sum(axis=1), out=indptr[1:])
+        indices = slots[present]
+    data = np.ones(len(indices))
+    X = sp.csr_matrix((data, indices, indptr), shape=(n, 1 + n_a + n_b + n_a * n_b))
+
+    inter_cols = [f"{a_col}__x__{b_col}" for a_col in a_level_names for b_col in b_level_names]
+    columns = ["Intercept"] + a_level_names + b_level_names + inter_cols
+    return X, columns, a_level_names, b_level_names
+
+
+def _sparse_frame(X: sp.spmatrix, columns: list) -> pd.DataFrame:
+    """Wrap a scipy sparse matrix as a DataFrame of sparse columns with fill value 0."""
+    Xc = sp.csc_matrix(X)
+    return pd.DataFrame(
+        {name: pd.arrays.SparseArray.from_spmatrix(Xc[:, [j]]) for j, name in enumerate(columns)}
+    )
+
+
 def _build_design_matrix_for_two_factors(
     levels_a: np.ndarray, levels_b: np.ndarray, drop_first: bool = False
 ) -> Tuple[pd.DataFrame, list, list]:
     """
     Build a design matrix for main effects of A, main effects of B and their interactions.
-    Returns (design_df, a_level_names, b_level_names).
+    Returns (design_df, a_level_names, b_level_names); design_df is backed by sparse columns.
 
     If drop_first is True, the first level of each factor is dropped to avoid perfect multicollinearity.
     We still use ridge regularization in fitting which handles identifiability.
     """
-    df = pd.DataFrame({"__A__": levels_a, "__B__": levels_b})
-    # One-hot encode factors
-    A_dummies = pd.get_dummies(df["__A__"], prefix="A", drop_first=drop_first)
-    B_dummies = pd.get_dummies(df["__B__"], prefix="B", drop_first=drop_first)
-
-    # Interaction columns: outer product of A_dummies and B_dummies column-wise
-    inter_cols = []
-    inter_df = []
-    for a_col in A_dummies.columns:
-        for b_col in B_dummies.columns:
-            name = f"{a_col}__x__{b_col}"
-            inter_cols.append(name)
-            inter_df.append(A_dummies[a_col].values * B_dummies[b_col].values)
-    if inter_df:
-        Inter = pd.DataFrame(np.column_stack(inter_df), columns=inter_cols, index=df.index)
-        design = pd.concat([pd.Series(1, index=df.index, name="Intercept"), A_dummies, B_dummies, Inter], axis=1)
-    else:
-        design = pd.concat([pd.Series(1, index=df.index, name="Intercept"), A_dummies, B_dummies], axis=1)
-
-    a_level_names = list(A_dummies.columns)
-    b_level_names = list(B_dummies.columns)
+    X, columns, a_level_names, b_level_names = _design_arrays_for_two_factors(levels_a, levels_b, drop_first)
+    design = _sparse_frame(X, columns)
     return design, a_level_names, b_level_names
 
 
+def _ridge_effects(coefs: np.ndarray, columns: list) -> Tuple[pd.Series, pd.Series, pd.DataFrame]:
+    """Split design-matrix coefficients into (main_effects_A, main_effects_B, interaction_table)."""
+    coef_series = pd.Series(coefs, index=columns)
+
+    # Extract main effects and interaction effects
+    main_A = coef_series[[c for c in columns if c.startswith("A_")]].copy()
+    main_B = coef_series[[c for c in columns if c.startswith("B_")]].copy()
+
+    # Reconstruct interaction table: entries for each pair of (A_dummy, B_dummy) that were present
+    inter_cols = [c for c in columns if "__x__" in c]
+    # derive original level names for rows/cols (dummy names include 'A_<level>' format)
+    # Build a matrix with index=unique A dummy prefixes, columns=unique B dummy suffixes
+    # We'll attempt to map back to readable A and B levels when possible.
+    # Parse names like "A_level__x__B_other"
+    interactions = {}
+    for c in inter_cols:
+        left, _, right = c.partition("__x__")
+        # left like "A_<lvl>", right like "B_<lvl2>"
+        interactions[c] = coef_series[c]
+
+    # Build a DataFrame for interactions with human-readable axis if possible
+    # Extract A level names (after prefix "A_") and B level names (after prefix "B_")
+    a_levels = sorted({name.split("A_", 1)[1] for name in main_A.index}) if len(main_A) > 0 else []
+    b_levels = sorted({name.split("B_", 1)[1] for name in main_B.index}) if len(main_B) > 0 else []
+
+    # When drop_first=True, some original levels are not present in dummy lists; interpret with caution.
+    interaction_table = pd.DataFrame(index=a_levels if a_levels else ["A_dummy"], columns=b_levels if b_levels else ["B_dummy"])
+    for c, val in interactions.items():
+        a_dummy, _, b_dummy = c.partition("__x__")
+        # parse a and b readable
+        a_read = a_dummy.split("A_", 1)[1] if "A_" in a_dummy else a_dummy
+        b_read = b_dummy.split("B_", 1)[1] if "B_" in b_dummy else b_dummy
+        # create cells if possible
+        try:
+            interaction_table.loc[a_read, b_read] = val
+        except KeyError:
+            # If mapping fails because we dropped first level or names mismatch, add to table dynamically
+            if a_read not in interaction_table.index:
+                interaction_table.loc[a_read] = np.nan
+            if b_read not in interaction_table.columns:
+                interaction_table[b_read] = np.nan
+            interaction_table.loc[a_read, b_read] = val
+
+    # Fill any remaining NaNs with 0.0 to indicate no estimated interaction for that dummy pair
+    interaction_table = interaction_table.fillna(0.0)
+
+    return main_A, main_B, interaction_table
+
+
+def _fit_two_factor_anova(
+    target: np.ndarray,
+    factor_a: pd.Series,
+    factor_b: pd.Series,
+    alpha: float,
+    drop_first: bool,
+) -> Dict[str, object]:
+    """
+    Closed-form fit of the saturated two-factor model (see fit_two_factor_approx_from_shap).
+    The least-squares fit of A + B + A x B dummies is the table of cell means, so no design
+    matrix or solver is needed: per-cell sums and counts are accumulated with np.bincount.
+    """
+    a_codes, a_uniq = _factor_codes(factor_a)
+    b_codes, b_uniq = _factor_codes(factor_b)
+    n_a, n_b = len(a_uniq), len(b_uniq)
+    observed = (a_codes >= 0) & (b_codes >= 0)
+    flat = a_codes.astype(np.intp) * n_b
+    flat += b_codes
+    y = target
+    if not observed.all():
+        # skip the masked copies in the common case of complete factor columns
+        flat, y = flat[observed], target[observed]
+    sums = np.bincount(flat, weights=y, minlength=n_a * n_b).reshape(n_a, n_b)
+    counts = np.bincount(flat, minlength=n_a * n_b).reshape(n_a, n_b).astype(np.float64)
+
+    # ridge-equivalent shrinkage of each cell mean toward the grand mean: alpha / (count + alpha)
+    grand = float(y.mean()) if y.size else 0.0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cell = (sums + alpha * grand) / (counts + alpha)
+    cell[counts == 0] = np.nan
+
+    with warnings.catch_warnings():
+        # levels without any observed cell have undefined means
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        if drop_first:
+            # treatment coding relative to the first level of each factor
+            intercept = cell[0, 0] if n_a and n_b else grand
+            row_eff = cell[:, :1] - intercept if n_b else np.zeros((n_a, 1))
+            col_eff = cell[:1, :] - intercept if n_a else np.zeros((1, n_b))
+        else:
+            # effect coding: overall mean of observed cells, centered row/column effects
+            intercept = np.nanmean(cell) if np.isfinite(cell).any() else grand
+            row_eff = np.nanmean(cell, axis=1, keepdims=True) - intercept
+            col_eff = np.nanmean(cell, axis=0, keepdims=True) - intercept
+    inter = cell - intercept - row_eff - col_eff
+
+    # predictions: the fitted cell mean; rows with a missing level fall back to the grand mean
+    fitted = np.where(np.isnan(cell), grand, cell)
+    pred = np.full(len(target), grand)
+    pred[observed] = fitted.ravel()[flat]
+    mse = float(np.mean((target - pred) ** 2))
+
+    first = 1 if drop_first else 0
+    a_names = [f"A_{lvl}" for lvl in a_uniq[first:]]
+    b_names = [f"B_{lvl}" for lvl in b_uniq[first:]]
+    main_A = pd.Series(np.nan_to_num(row_eff[first:, 0]), index=a_names)
+    main_B = pd.Series(np.nan_to_num(col_eff[0, first:]), index=b_names)
+    interaction_table = pd.DataFrame(
+        np.nan_to_num(inter[first:, first:]),
+        index=[str(lvl) for lvl in a_uniq[first:]],
+        columns=[str(lvl) for lvl in b_uniq[first:]],
+    )
+    return {
+        "model": None,
+        "design_matrix": None,
+        "a_levels": a_names,
+        "b_levels": b_names,
+        "main_effects_A": main_A,
+        "main_effects_B": main_B,
+        "interaction_table": interaction_table,
+        "pred": pred,
+        "mse": mse,
+    }
+
+
+class TwoFactorFit:
+    """
+    Ridge fit of the two-factor model for fixed factor columns, reusable across many targets.
+
+    The design depends only on the factor columns, so it is built once together with the
+    Cholesky factor of X^T X + alpha * I. Each fit is then a sparse matvec X^T y followed by
+    two triangular solves, which suits bootstrap or cross-validation loops where only the
+    target changes.
+
+    Parameters
+    ----------
+    factor_a, factor_b :
+        Sequences of length n_samples with the levels of factors A and B.
+    alpha :
+        Ridge penalty; must be positive (the full dummy design is rank deficient).
+    drop_first :
+        Whether to drop the first level dummy of each factor.
+    """
+
+    def __init__(self, factor_a, factor_b, alpha: float = 1e-6, drop_first: bool = False):
+        if alpha <= 0:
+            raise ValueError("alpha must be positive")
+        X, columns, a_names, b_names = _design_arrays_for_two_factors(factor_a, factor_b, drop_first=drop_first)
+        self.X = X
+        self.columns = columns
+        self.a_levels = a_names
+        self.b_levels = b_names
+        self.alpha = float(alpha)
+        gram = (X.T @ X).toarray()
+        gram[np.diag_indices_from(gram)] += self.alpha
+        self._chol = cho_factor(gram, lower=True)
+        self._Xt = X.T.tocsr()
+
+    def coef(self, target: np.ndarray) -> np.ndarray:
+        """Ridge coefficients for target, ordered like self.columns."""
+        target = np.asarray(target, dtype=np.float64)
+        if target.shape != (self.X.shape[0],):
+            raise ValueError("target must be a 1-dimensional array of shape (n_samples,)")
+        return cho_solve(self._chol, self._Xt @ target)
+
+    def fit(self, target: np.ndarray, return_design: bool = True) -> Dict[str, object]:
+        """Fit target and return the same dictionary as fit_two_factor_approx_from_shap(solver='ridge')."""
+        target = np.asarray(target, dtype=np.float64)
+        coefs = self.coef(target)
+        pred = self.X @ coefs
+        main_A, main_B, interaction_table = _ridge_effects(coefs, self.columns)
+        return {
+            "model": self,
+            "design_matrix": _sparse_frame(self.X, self.columns) if return_design else None,
+            "a_levels": self.a_levels,
+            "b_levels": self.b_levels,
+            "main_effects_A": main_A,
+            "main_effects_B": main_B,
+            "interaction_table": interaction_table,
+            "pred": pred,
+            "mse": float(np.mean((target - pred) ** 2)),
+        }
+
+
+# Recently used TwoFactorFit instances, keyed by a digest of the factor columns and settings
+_FIT_CACHE: "OrderedDict[bytes, TwoFactorFit]" = OrderedDict()
+_FIT_CACHE_SIZE = 4
+
+
+def _two_factor_fit_for(factor_a, factor_b, alpha: float, drop_first: bool) -> TwoFactorFit:
+    """Return a cached TwoFactorFit for these exact factor columns (not just their level sets)."""
+    a_codes, a_uniq = _factor_codes(factor_a)
+    b_codes, b_uniq = _factor_codes(factor_b)
+    h = hashlib.blake2b(digest_size=16)
+    for part in (a_codes, b_codes):
+        h.update(np.ascontiguousarray(part, dtype=np.int64).tobytes())
+    h.update(repr((list(a_uniq), list(b_uniq), float(alpha), bool(drop_first))).encode("utf-8"))
+    key = h.digest()
+    fit = _FIT_CACHE.get(key)
+    if fit is None:
+        fit = TwoFactorFit(factor_a, factor_b, alpha=alpha, drop_first=drop_first)
+        _FIT_CACHE[key] = fit
+        if len(_FIT_CACHE) > _FIT_CACHE_SIZE:
+            _FIT_CACHE.popitem(last=False)
+    else:
+        _FIT_CACHE.move_to_end(key)
+    return fit
+
+
 def fit_two_factor_approx_from_shap(
     target: np.ndarray,
     factor_a: pd.Series,
     factor_b: pd.Series,
     alpha: float = 1e-6,
     drop_first: bool = False,
+    tol: float = 1e-10,
+    solver: str = "ridge",
+    return_design: bool = True,
 ) -> Dict[str, object]:
     """
     Fit a ridge-regularized linear model that approximates the provided scalar target
@@ -128,13 +495,28 @@ def fit_two_factor_approx_from_shap(
         Regularization strength for Ridge regression (lambda).
     drop_first :
         Whether to drop the first level dummy to reduce multicollinearity.
+    tol :
+        Convergence tolerance of the sparse conjugate-gradient Ridge solver.
+    solver :
+        'ridge' (default) builds the sparse design matrix and fits sklearn's Ridge on it, with
+        conjugate gradients or, when nA * nB <= 16, an exact Cholesky solve of the small Gram.
+        'cholesky' solves the same ridge problem with a cached TwoFactorFit, so repeated calls with
+        the same factor columns reuse the factorization and only pay for one matvec and two
+        triangular solves. 'anova' (opt-in) derives the fit in closed form from per-cell sums and
+        counts, with cell means shrunk toward the grand mean by alpha / (count + alpha); its
+        predictions match 'ridge' up to the penalty, but see Notes for its different return values.
+    return_design :
+        With solver='ridge', whether to wrap the sparse design in a DataFrame for the result.
+        Set to False when only the effects are needed (e.g. in resampling loops).
 
     Returns
     -------
     dict
         {
-          "model": fitted sklearn.linear_model.Ridge,
-          "design_matrix": pandas.DataFrame,
+          "model": fitted sklearn.linear_model.Ridge (TwoFactorFit for solver='cholesky',
+                   None for solver='anova'),
+          "design_matrix": pandas.DataFrame with sparse columns (None for solver='anova'
+                           or return_design=False),
           "a_levels": list of A dummy names,
           "b_levels": list of B dummy names,
           "main_effects_A": pandas.Series indexed by A level dummy names,
@@ -148,6 +530,11 @@ def fit_two_factor_approx_from_shap(
     -----
     The returned main effects correspond to the coefficients in the design matrix.
     Interpreting coefficients when drop_first=True requires mapping dummy names back to original levels.
+    solver='anova' returns different coefficients and no fitted objects: "model" and
+    "design_matrix" are None, and the saturated model is identified by effect coding (main effects
+    and interactions centered over observed cells) or, with drop_first=True, by treatment coding
+    relative to the first level of each factor, instead of by the ridge one-hot coefficients. Its
+    interaction_table rows and columns follow the sorted factor levels.
     """
     if target.ndim != 1:
         raise ValueError("target must be a 1-dimensional array of shape (n_samples,)")
@@ -155,64 +542,31 @@ def fit_two_factor_approx_from_shap(
     if len(target) != len(factor_a) or len(target) != len(factor_b):
         raise ValueError("target and factor series must have the same length")
 
-    design, a_names, b_names = _build_design_matrix_for_two_factors(
-        np.asarray(factor_a), np.asarray(factor_b), drop_first=drop_first
-    )
+    if solver == "anova":
+        return _fit_two_factor_anova(np.asarray(target, dtype=np.float64), factor_a, factor_b, alpha, drop_first)
+    if solver == "cholesky":
+        return _two_factor_fit_for(factor_a, factor_b, alpha, drop_first).fit(target, return_design=return_design)
+    if solver != "ridge":
+        raise ValueError("solver must be 'anova', 'ridge' or 'cholesky'")
+
+    # factors are passed as given so categorical columns keep their stored codes
+    X, columns, a_names, b_names = _design_arrays_for_two_factors(factor_a, factor_b, drop_first=drop_first)
 
-    # Fit ridge regression (closed-form via sklearn)
-    ridge = lm.Ridge(alpha=alpha, fit_intercept=False)  # intercept already present in design
-    ridge.fit(design.values, target)
+    # Fit ridge regression on the sparse design with conjugate gradients (matvecs stay sparse);
+    # tiny factor problems have at most 25 columns, so the exact solve on X^T X is cheaper
+    n_cells = (len(a_names) + drop_first) * (len(b_names) + drop_first)
+    ridge_solver = "cholesky" if n_cells <= _SMALL_CELLS_MAX else "sparse_cg"
+    ridge = lm.Ridge(alpha=alpha, fit_intercept=False, solver=ridge_solver, tol=tol)  # intercept already in design
+    ridge.fit(X, target)
     coefs = ridge.coef_
-    pred = ridge.predict(design.values)
+    pred = ridge.predict(X)
     mse = float(np.mean((target - pred) ** 2))
 
-    coef_series = pd.Series(coefs, index=design.columns)
-
-    # Extract main effects and interaction effects
-    main_A = coef_series[[c for c in design.columns if c.startswith("A_")]].copy()
-    main_B = coef_series[[c for c in design.columns if c.startswith("B_")]].copy()
-
-    # Reconstruct interaction table: entries for each pair of (A_dummy, B_dummy) that were present
-    inter_cols = [c for c in design.columns if "__x__" in c]
-    # derive original level names for rows/cols (dummy names include 'A_<level>' format)
-    # Build a matrix with index=unique A dummy prefixes, columns=unique B dummy suffixes
-    # We'll attempt to map back to readable A and B levels when possible.
-    # Parse names like "A_level__x__B_other"
-    interactions = {}
-    for c in inter_cols:
-        left, _, right = c.partition("__x__")
-        # left like "A_<lvl>", right like "B_<lvl2>"
-        interactions[c] = coef_series[c]
-
-    # Build a DataFrame for interactions with human-readable axis if possible
-    # Extract A level names (after prefix "A_") and B level names (after prefix "B_")
-    a_levels = sorted({name.split("A_", 1)[1] for name in main_A.index}) if len(main_A) > 0 else []
-    b_levels = sorted({name.split("B_", 1)[1] for name in main_B.index}) if len(main_B) > 0 else []
-
-    # When drop_first=True, some original levels are not present in dummy lists; interpret with caution.
-    interaction_table = pd.DataFrame(index=a_levels if a_levels else ["A_dummy"], columns=b_levels if b_levels else ["B_dummy"])
-    for c, val in interactions.items():
-        a_dummy, _, b_dummy = c.partition("__x__")
-        # parse a and b readable
-        a_read = a_dummy.split("A_", 1)[1] if "A_" in a_dummy else a_dummy
-        b_read = b_dummy.split("B_", 1)[1] if "B_" in b_dummy else b_dummy
-        # create cells if possible
-        try:
-            interaction_table.loc[a_read, b_read] = val
-        except KeyError:
-            # If mapping fails because we dropped first level or names mismatch, add to table dynamically
-            if a_read not in interaction_table.index:
-                interaction_table.loc[a_read] = np.nan
-            if b_read not in interaction_table.columns:
-                interaction_table[b_read] = np.nan
-            interaction_table.loc[a_read, b_read] = val
-
-    # Fill any remaining NaNs with 0.0 to indicate no estimated interaction for that dummy pair
-    interaction_table = interaction_table.fillna(0.0)
+    main_A, main_B, interaction_table = _ridge_effects(coefs, columns)
 
     return {
         "model": ridge,
-        "design_matrix": design,
+        "design_matrix": _sparse_frame(X, columns) if return_design else None,
         "a_levels": a_names,
         "b_levels": b_names,
         "main_effects_A": main_A,
@@ -4,87 +4,255 @@
 
 from __future__ import annotations
 
+import copy
+import functools
 import os
 import time
+import warnings
 import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Literal, Optional, Tuple
 
 try:
     import numpy as np
 except Exception:  # pragma: no cover - numpy expected in scientific envs
     np = None
 
-try:
-    import torch
-except Exception:
-    torch = None
+# torch is imported on first use (see _get_torch): importing it costs a noticeable fraction of a
+# second, which callers that only need numpy determinism or checkpoint paths should not pay
+_UNSET = object()
+_torch = _UNSET
+
+
+def _get_torch():
+    """The torch module, imported on the first call; None if it is not installed."""
+    global _torch
+    if _torch is _UNSET:
+        try:
+            import torch as _t
+        except Exception:
+            _t = None
+        _torch = _t
+    return _torch
+
+
+def _encode_factor(values) -> "Tuple[np.ndarray, pd.Index]":
+    """
+    int32 level codes and sorted levels of one factor, as pd.factorize(values, sort=True)
+    (missing values get code -1, unobserved levels are dropped).
+
+    Categorical input reuses its stored codes and categories instead of hashing every value:
+    the codes are only remapped when some categories are unobserved. Shared by factors.effects
+    and factors.shap_fit.
+    """
+    import pandas as pd  # local import: utils itself does not need pandas
+
+    if isinstance(getattr(values, "dtype", None), pd.CategoricalDtype):
+        cat = pd.Categorical(values)
+        codes = cat.codes.astype(np.int32)
+        n_cat = len(cat.categories)
+        observed = np.bincount(codes[codes >= 0], minlength=n_cat) > 0
+        if observed.all():
+            levels = pd.CategoricalIndex(cat.categories, dtype=cat.dtype)
+        else:
+            remap = np.cumsum(observed, dtype=np.int32) - 1
+            codes = np.where(codes >= 0, remap[codes], -1).astype(np.int32)
+            levels = pd.CategoricalIndex(cat.categories[observed], dtype=cat.dtype)
+        return codes, levels
+    codes, levels = pd.factorize(values, sort=True)
+    return codes.astype(np.int32, copy=False), pd.Index(levels)
+
+
+def make_rng(seed: Optional[int] = None) -> "np.random.Generator":
+    """
+    Explicit numpy Generator (PCG64) for code that should not draw from the legacy global
+    RandomState: no shared global state, and faster than MT19937 for most distributions.
+    """
+    return np.random.default_rng(seed)
+
+
+# Module-level Generator for downstream code (`from factors.utils import RNG`); set_seed reseeds it
+# in place, so references imported before seeding stay valid
+RNG = make_rng() if np is not None else None
 
 
 def set_seed(seed: Optional[int]) -> None:
     """
     Set random seed for python, numpy, and torch (if available) for reproducibility.
     This function sets common RNGs but does not guarantee bitwise reproducibility across systems.
+
+    str/bytes hash randomization cannot be changed from a running interpreter: PYTHONHASHSEED is
+    read only at start-up, so it is not set here (see warn_if_hash_seed_unset).
     """
     if seed is None:
         return
     random.seed(seed)
     if np is not None:
         np.random.seed(seed)
-    os.environ["PYTHONHASHSEED"] = str(seed)
+        # same stream as make_rng(seed)
+        RNG.bit_generator.state = np.random.PCG64(seed).state
+    torch = _get_torch()
     if torch is not None:
         torch.manual_seed(seed)
         try:
-            torch.cuda.manual_seed_all(seed)
+            # manual_seed already seeds CUDA devices lazily; skip the explicit call (and the CUDA
+            # runtime probe it implies) on machines without a GPU
+            if torch.cuda.is_available():
+                torch.cuda.manual_seed_all(seed)
         except Exception:
             pass
 
 
-def enable_deterministic_torch() -> None:
+def warn_if_hash_seed_unset(seed: Optional[int]) -> bool:
+    """
+    Warn when the interpreter was not started with PYTHONHASHSEED=<seed>.
+
+    Hash randomization (iteration order of str-keyed sets, for instance) is fixed at interpreter
+    start-up, so reproducing it requires launching the process as `PYTHONHASHSEED=<seed> python ...`.
+    Returns True if a warning was emitted.
+    """
+    if seed is None or os.environ.get("PYTHONHASHSEED") == str(seed):
+        return False
+    warnings.warn(
+        f"PYTHONHASHSEED is not {seed}; str hashing is randomized for this process. "
+        f"Run as `PYTHONHASHSEED={seed} python ...` for fully reproducible runs.",
+        RuntimeWarning,
+        stacklevel=2,
+    )
+    return True
+
+
+def enable_deterministic_torch(
+    mode: Literal["off", "warn", "strict"] = "warn",
+    cublas_workspace: bool = True,
+) -> None:
     """
     Attempt to enable deterministic behavior in PyTorch. Use with caution as it may
     reduce performance or not be supported for some ops.
+
+    Parameters
+    ----------
+    mode :
+        "off" leaves torch untouched (seeding alone already makes weight init and data order
+        reproducible). "warn" prefers deterministic algorithms but only warns for ops that have
+        none (torch.use_deterministic_algorithms(True, warn_only=True)). "strict" makes such ops
+        raise instead.
+    cublas_workspace :
+        In "strict" mode, set CUBLAS_WORKSPACE_CONFIG=:4096:8 (unless already set), which
+        deterministic cuBLAS requires on CUDA >= 10.2.
     """
+    if mode not in ("off", "warn", "strict"):
+        raise ValueError(f"mode must be 'off', 'warn' or 'strict', got {mode!r}")
+    if mode == "off":
+        return
+    torch = _get_torch()
     if torch is None:
         return
+    if mode == "strict" and cublas_workspace:
+        os.environ.setdefault("CUBLAS_WORKSPACE_CONFIG", ":4096:8")
     try:
-        torch.use_deterministic_algorithms(True)
+        if mode == "strict":
+            torch.use_deterministic_algorithms(True)
+        else:
+            torch.use_deterministic_algorithms(True, warn_only=True)
     except Exception:
         # Older torch versions
-        torch.backends.cudnn.deterministic = True
-        torch.backends.cudnn.benchmark = False
+        pass
+    torch.backends.cudnn.deterministic = True
+    torch.backends.cudnn.benchmark = False
+
+
+@dataclass
+class TimerResult:
+    """Elapsed time recorded by Timer, filled in when the block exits."""
+    elapsed_ns: int = 0
+
+    @property
+    def elapsed(self) -> float:
+        return self.elapsed_ns * 1e-9
 
 
 @contextmanager
-def Timer(name: Optional[str] = None, warmup: bool = False):
+def Timer(
+    name: Optional[str] = None,
+    warmup: bool = False,
+    logger: Optional[Callable[[str], Any]] = print,
+):
     """
     Context manager to measure elapsed wall-clock time.
 
+    Uses the monotonic time.perf_counter_ns clock (integer nanoseconds, unaffected by NTP
+    adjustments). The message is passed to `logger` (print by default); with logger=None
+    nothing is formatted or printed and the time is only available on the yielded TimerResult.
+
     Usage:
         with Timer("train"):
             do_work()
+
+        with Timer(logger=None) as t:
+            kernel()
+        t.elapsed  # seconds
     """
-    start = time.time()
+    result = TimerResult()
+    start = time.perf_counter_ns()
     try:
-        yield
+        yield result
     finally:
-        end = time.time()
-        elapsed = end - start
-        if name:
-            print(f"[Timer] {name} finished in {elapsed:.3f} s")
-        else:
-            print(f"[Timer] finished in {elapsed:.3f} s")
+        result.elapsed_ns = time.perf_counter_ns() - start
+        if logger is not None:
+            elapsed = result.elapsed
+            if name:
+                logger(f"[Timer] {name} finished in {elapsed:.3f} s")
+            else:
+                logger(f"[Timer] finished in {elapsed:.3f} s")
 
 
 def ensure_dir(path: str | Path) -> Path:
     """Ensure directory exists and return Path object. Duplicate helper for convenience."""
     p = Path(path)
-    p.mkdir(parents=True, exist_ok=True)
+    # one stat when the directory already exists instead of a mkdir attempt per parent
+    if not p.is_dir():
+        p.mkdir(parents=True, exist_ok=True)
     return p
 
 
+def _snapshot(obj: Any) -> Any:
+    """
+    Copy the tensors/arrays of a (nested) dict, list or tuple so a background writer does not
+    see later in-place updates. torch tensors are detached and copied to CPU on the calling thread.
+    """
+    # a tensor can only exist if the caller already imported torch, so do not import it here
+    torch = sys.modules.get("torch")
+    if torch is not None and isinstance(obj, torch.Tensor):
+        t = obj.detach()
+        return t.clone() if t.device.type == "cpu" else t.to("cpu")
+    if np is not None and isinstance(obj, np.ndarray):
+        return obj.copy()
+    if isinstance(obj, dict):
+        # shallow copy keeps the mapping type and attributes (e.g. a state_dict's _metadata)
+        out = copy.copy(obj)
+        for k, v in obj.items():
+            out[k] = _snapshot(v)
+        return out
+    if isinstance(obj, (list, tuple)) and type(obj) in (list, tuple):
+        return type(obj)(_snapshot(v) for v in obj)
+    return obj
+
+
+@functools.lru_cache(maxsize=1024)
+def ensure_dir_cached(path: str) -> Path:
+    """
+    ensure_dir for hot loops (e.g. per-epoch subdirectories): repeated calls with the same path
+    string are a dictionary lookup returning the same Path object, with no filesystem access.
+    A directory removed after its first call is not recreated.
+    """
+    return ensure_dir(path)
+
+
 @dataclass
 class CheckpointManager:
     """
@@ -92,25 +260,84 @@ class CheckpointManager:
     Example:
         mgr = CheckpointManager("experiments/run1/checkpoints")
         mgr.save({"model_state": state_dict}, "step_100")
+
+    With async_save=True, save() snapshots the tensors/arrays of obj and returns immediately
+    while a single background thread writes the file; call wait() (or close()) before reading
+    the checkpoints back. Write errors are re-raised (once) by wait().
     """
     run_dir: str | Path
+    async_save: bool = False
 
     def __post_init__(self):
         self.dir = ensure_dir(self.run_dir)
+        self._executor = ThreadPoolExecutor(max_workers=1) if self.async_save else None
+        self._pending = []
+        self._errors = []
+        # latest checkpoint is scanned once here and then tracked by save()
+        self._latest = self._scan_latest()
 
     def save(self, obj: object, name: str) -> Path:
         """
-        Save Python object using pickle or torch.save (if available) under <run_dir>/<name>.pt
-        Returns the path to the saved file.
+        Save Python object with factors.io.save_checkpoint (safetensors for flat tensor dicts,
+        otherwise torch.save if available, else pickle) under <run_dir>/<name>.pt
+        Returns the path to the saved file (still being written when async_save is True).
         """
         from .io import save_checkpoint  # local import to avoid cycle at module import time
 
         filename = f"{name}.pt"
         path = self.dir / filename
-        save_checkpoint(obj, path)
+        if self._executor is None:
+            save_checkpoint(obj, path)
+            self._latest = path
+        else:
+            self._pending.append((self._executor.submit(save_checkpoint, _snapshot(obj), path), path))
         return path
 
+    def wait(self) -> None:
+        """
+        Block until all queued background saves have finished; re-raise the first failure not
+        raised yet. Each failure is raised once, by the next wait() (or close()) after it happened.
+        """
+        self._drain()
+        errors, self._errors = self._errors, []
+        if errors:
+            raise errors[0]
+
+    def _drain(self) -> None:
+        """Wait for queued saves, tracking completed ones and keeping failures for wait()."""
+        pending, self._pending = self._pending, []
+        for fut, path in pending:
+            exc = fut.exception()
+            if exc is None:
+                self._latest = path
+            else:
+                self._errors.append(exc)
+
+    def close(self) -> None:
+        """Wait for queued saves and stop the background writer thread."""
+        self.wait()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
     def latest(self) -> Optional[Path]:
         """Return latest checkpoint file or None if none exist."""
-        files = sorted(self.dir.glob("*.pt"), key=lambda p: p.stat().st_mtime)
-        return files[-1] if files else None
+        # only completed checkpoints count; a read-only lookup leaves save failures to wait()
+        self._drain()
+        if self._latest is None or not self._latest.exists():
+            # deleted externally: fall back to a fresh scan
+            self._latest = self._scan_latest()
+        return self._latest
+
+    def _scan_latest(self) -> Optional[Path]:
+        """Most recently modified *.pt file in the directory (os.scandir reuses the directory read)."""
+        best, best_mtime = None, None
+        with os.scandir(self.dir) as it:
+            for entry in it:
+                if not entry.name.endswith(".pt"):
+                    continue
+                mtime = entry.stat().st_mtime
+                # ">=" keeps the last of equal mtimes, like the stable sort this replaces
+                if best_mtime is None or mtime >= best_mtime:
+                    best, best_mtime = entry.path, mtime
+        return Path(best) if best is not None else None
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+import pandas as pd
+import numpy as np
+import pytest
+
+from factors import bootstrap as fb
+
+
+def make_toy_df():
+    # 2x2 table with a few noisy observations per cell
+    rng = np.random.default_rng(0)
+    rows = []
+    for a, b, mu in [("A1", "B1", 1.0), ("A1", "B2", 2.0), ("A2", "B1", 3.0), ("A2", "B2", 4.0)]:
+        for val in mu + 0.1 * rng.standard_normal(20):
+            rows.append({"A": a, "B": b, "y": float(val)})
+    return pd.DataFrame(rows)
+
+
+def test_bootstrap_cell_statistics_shapes_and_seed():
+    df = make_toy_df()
+    boot = fb.bootstrap_cell_statistics(df, ["A", "B"], "y", n_boot=200, random_state=1)
+    assert set(boot.keys()) == {("A1", "B1"), ("A1", "B2"), ("A2", "B1"), ("A2", "B2")}
+    assert all(v.shape == (200,) for v in boot.values())
+    # replicate means should be centred on the cell mean
+    cell_mean = df[(df.A == "A2") & (df.B == "B2")]["y"].mean()
+    assert float(boot[("A2", "B2")].mean()) == pytest.approx(cell_mean, abs=0.05)
+    # same seed -> identical replicates
+    again = fb.bootstrap_cell_statistics(df, ["A", "B"], "y", n_boot=200, random_state=1)
+    np.testing.assert_array_equal(boot[("A1", "B1")], again[("A1", "B1")])
+
+
+def test_bootstrap_cell_statistics_custom_stat():
+    df = make_toy_df()
+    boot = fb.bootstrap_cell_statistics(df, ["A", "B"], "y", stat=np.max, n_boot=50, random_state=0)
+    cell_max = df[(df.A == "A1") & (df.B == "B1")]["y"].max()
+    # every resampled maximum is bounded by the observed maximum
+    assert float(boot[("A1", "B1")].max()) <= cell_max
+
+
+def test_bootstrap_cell_statistics_n_jobs_does_not_change_results():
+    df = make_toy_df()
+    serial = fb.bootstrap_cell_statistics(df, ["A", "B"], "y", n_boot=100, random_state=3, engine="numpy")
+    threaded = fb.bootstrap_cell_statistics(df, ["A", "B"], "y", n_boot=100, random_state=3, engine="numpy", n_jobs=2)
+    for key in serial:
+        np.testing.assert_array_equal(serial[key], threaded[key])
+
+
+def test_bootstrap_numba_engine_matches_cell_means():
+    pytest.importorskip("numba")
+    df = make_toy_df()
+    boot = fb.bootstrap_cell_statistics(df, ["A", "B"], "y", n_boot=500, random_state=0, engine="numba")
+    again = fb.bootstrap_cell_statistics(df, ["A", "B"], "y", n_boot=500, random_state=0, engine="numba")
+    cell_mean = df[(df.A == "A1") & (df.B == "B2")]["y"].mean()
+    assert float(boot[("A1", "B2")].mean()) == pytest.approx(cell_mean, abs=0.05)
+    np.testing.assert_array_equal(boot[("A1", "B2")], again[("A1", "B2")])
+
+
+def test_bootstrap_to_dataframe_pads_ragged_replicates():
+    boot = {("A1", "B1"): np.array([1.0, 2.0, 3.0]), ("A1", "B2"): np.array([4.0])}
+    df = fb.bootstrap_to_dataframe(boot)
+    assert df.shape == (2, 3)
+    assert float(df.loc[("A1", "B2"), "boot_0"]) == pytest.approx(4.0)
+    assert np.isnan(df.loc[("A1", "B2"), "boot_2"])
+
+
+def test_bootstrap_cell_statistics_accepts_precomputed_groups():
+    df = make_toy_df()
+    groups = {key: s.to_numpy() for key, s in df.groupby(["A", "B"])["y"]}
+    from_df = fb.bootstrap_cell_statistics(df, ["A", "B"], "y", n_boot=50, random_state=0)
+    from_groups = fb.bootstrap_cell_statistics(None, ["A", "B"], "y", n_boot=50, random_state=0, groups=groups)
+    for key in from_df:
+        np.testing.assert_array_equal(from_df[key], from_groups[key])
+
+
+def test_compute_bootstrap_ci_se_method_uses_exact_z():
+    boot_df = fb.bootstrap_to_dataframe({("A1", "B1"): np.array([1.0, 2.0, 3.0, 4.0])})
+    ci = fb.compute_bootstrap_ci(boot_df, alpha=0.05, ci_method="se")
+    se = float(ci["se"].iloc[0])
+    assert float(ci["ci_upper"].iloc[0]) == pytest.approx(2.5 + 1.959964 * se, rel=1e-6)
+
+
+def test_compute_bootstrap_ci_streaming_matches_dataframe_path():
+    df = make_toy_df()
+    boot = fb.bootstrap_cell_statistics(df, ["A", "B"], "y", n_boot=100, random_state=0)
+    ci_df = fb.compute_bootstrap_ci(fb.bootstrap_to_dataframe(boot))
+    streamed = fb.compute_bootstrap_ci_streaming(
+        fb.iter_bootstrap_cell_statistics(df, ["A", "B"], "y", n_boot=100, random_state=0)
+    )
+    pd.testing.assert_frame_equal(streamed, ci_df, check_exact=False)
+
+
+def test_compute_bootstrap_ci_percentile_order_statistics():
+    reps = np.random.default_rng(0).permutation(np.arange(200, dtype=float))
+    boot_df = fb.bootstrap_to_dataframe({("A1", "B1"): reps, ("A1", "B2"): reps[:100]})
+    ci = fb.compute_bootstrap_ci(boot_df, alpha=0.05)
+    # ranks floor(0.025 * B) and ceil(0.975 * B) - 1 of the sorted replicates
+    full = np.sort(reps)
+    assert float(ci.loc[("A1", "B1"), "ci_lower"]) == full[5]
+    assert float(ci.loc[("A1", "B1"), "ci_upper"]) == full[194]
+    # the padded (ragged) row uses its own replicate count
+    short = np.sort(reps[:100])
+    assert float(ci.loc[("A1", "B2"), "ci_lower"]) == short[2]
+    assert float(ci.loc[("A1", "B2"), "ci_upper"]) == short[97]
+    assert float(ci.loc[("A1", "B2"), "se"]) == pytest.approx(np.std(reps[:100], ddof=1))
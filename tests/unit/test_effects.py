@@ -61,3 +61,55 @@ def test_two_factor_interaction_matrix_properties():
     col_means = cm.mean(axis=0)
     expected = cm.loc["A1", "B1"] - row_means.loc["A1"] - col_means.loc["B1"] + overall
     assert float(I.loc["A1", "B1"]) == pytest.approx(float(expected))
+
+
+def test_two_factor_interaction_matrix_preserves_missing_cells():
+    cm = pd.DataFrame([[1.0, np.nan], [3.0, 4.0]], index=["A1", "A2"], columns=["B1", "B2"])
+    I = fe.two_factor_interaction_matrix(cm)
+    assert np.isnan(I.loc["A1", "B2"])
+    # present cells use NaN-skipping row/column/overall means
+    expected = 3.0 - 3.5 - 2.0 + np.nanmean(cm.values)
+    assert float(I.loc["A2", "B1"]) == pytest.approx(expected)
+
+
+def test_two_factor_interaction_matrix_all_missing_row_is_silent(recwarn):
+    from factors import pci as fp
+
+    cm = pd.DataFrame([[np.nan, np.nan], [3.0, 4.0], [1.0, 2.0]], columns=["B1", "B2"])
+    I = fe.two_factor_interaction_matrix(cm)
+    assert not recwarn.list
+    assert I.iloc[0].isna().all()
+    pd.testing.assert_frame_equal(I, fp.interaction_matrix_from_cell_means(cm))
+
+
+def test_estimate_two_factor_cell_means_arr_matches_groupby():
+    df = pd.DataFrame(
+        {
+            "A": ["a2", "a1", "a1", "a2", "a1", None],
+            "B": ["b1", "b1", "b2", "b1", "b1", "b2"],
+            "y": [1.0, 2.0, 3.0, 5.0, np.nan, 7.0],
+        }
+    )
+    M, levels_a, levels_b = fe.estimate_two_factor_cell_means_arr(df, "A", "B", "y")
+    expected = fe.estimate_two_factor_cell_means(df, "A", "B", "y")
+    assert list(levels_a) == list(expected.index)
+    assert list(levels_b) == list(expected.columns)
+    np.testing.assert_allclose(M, expected.to_numpy(), equal_nan=True)
+    # (a2, b2) has no observations
+    assert np.isnan(M[1, 1])
+    # per-cell arrays come out in sorted cell order, as groupby yields them
+    *_, groups = fe.estimate_two_factor_cell_means_arr(df, "A", "B", "y", return_groups=True)
+    expected_groups = {key: s.to_numpy() for key, s in df.groupby(["A", "B"])["y"]}
+    assert list(groups) == list(expected_groups)
+    for key, values in expected_groups.items():
+        np.testing.assert_array_equal(groups[key], values)
+
+
+def test_encode_factor_matches_factorize_for_categoricals():
+    values = pd.Series(pd.Categorical(["b", "a", None, "a"], categories=["c", "b", "a", "z"]))
+    codes, levels = fe._encode_factor(values)
+    expected_codes, expected_levels = pd.factorize(values, sort=True)
+    np.testing.assert_array_equal(codes, expected_codes)
+    assert codes.dtype == np.int32
+    # unobserved categories ("c", "z") are dropped and category order is kept
+    assert list(levels) == list(expected_levels) == ["b", "a"]
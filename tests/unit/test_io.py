@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+import numpy as np
+import pytest
+
+from factors import io as fio
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_save_metrics_json_accepts_numpy_scalars(tmp_path, monkeypatch, use_orjson):
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(fio, "orjson", None)
+    metrics = {
+        "n_cells": np.int64(15),
+        "mean": np.float32(0.5),
+        "cells": [("a", "b")],
+        "arr": np.arange(3),
+        "pci": float("nan"),
+        "ci": [np.float64(-np.inf), 1.0],
+        "se": np.array([0.1, np.nan]),
+    }
+    out = tmp_path / "run" / "metrics.json"
+    fio.save_metrics_json(metrics, out)
+    text = out.read_text(encoding="utf-8")
+    # non-finite values are written as null by both backends (strict JSON)
+    assert "NaN" not in text and "Infinity" not in text
+    loaded = json.loads(text)
+    assert loaded == {
+        "n_cells": 15,
+        "mean": 0.5,
+        "cells": [["a", "b"]],
+        "arr": [0, 1, 2],
+        "pci": None,
+        "ci": [None, 1.0],
+        "se": [0.1, None],
+    }
+    assert not out.with_suffix(".json.tmp").exists()
+
+
+def test_git_commit_hash_reads_refs_without_subprocess(tmp_path, monkeypatch):
+    git_dir = tmp_path / ".git"
+    (git_dir / "refs" / "heads").mkdir(parents=True)
+    (git_dir / "HEAD").write_text("ref: refs/heads/main\n")
+    sha = "0123456789abcdef0123456789abcdef01234567"
+    (git_dir / "packed-refs").write_text(f"# pack-refs with: peeled\n{sha} refs/heads/main\n")
+    work = tmp_path / "sub"
+    work.mkdir()
+    monkeypatch.chdir(work)
+    assert fio.git_commit_hash() == sha
+
+
+def test_checkpoint_roundtrip(tmp_path):
+    obj = {"weights": np.arange(10, dtype=np.float32), "step": 3}
+    path = tmp_path / "ckpt" / "model.pt"
+    fio.save_checkpoint(obj, path)
+    loaded = fio.load_checkpoint(path)
+    assert loaded["step"] == 3
+    np.testing.assert_array_equal(np.asarray(loaded["weights"]), obj["weights"])
+
+
+def test_safetensors_header_detection(tmp_path):
+    # pickle checkpoints are not mistaken for safetensors files
+    pickled = tmp_path / "a.pt"
+    fio.save_checkpoint({"step": 1}, pickled)
+    assert fio._safetensors_format(pickled) is None
+    header = json.dumps({"__metadata__": {"factors_format": "np"}}).encode()
+    tagged = tmp_path / "b.pt"
+    tagged.write_bytes(len(header).to_bytes(8, "little") + header)
+    assert fio._safetensors_format(tagged) == "np"
+
+
+def test_checkpoint_roundtrip_numpy_state_with_safetensors(tmp_path):
+    pytest.importorskip("safetensors")
+    obj = {"w": np.arange(6, dtype=np.float32).reshape(2, 3), "b": np.zeros(3)}
+    path = tmp_path / "state.pt"
+    fio.save_checkpoint(obj, path)
+    assert fio._safetensors_format(path) == "np"
+    loaded = fio.load_checkpoint(path)
+    for key, value in obj.items():
+        np.testing.assert_array_equal(loaded[key], value)
+
+
+def test_save_many_writes_json_and_figures(tmp_path):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fio.save_many([({"run": i}, tmp_path / f"run_{i}" / "metrics.json") for i in range(5)], kind="json")
+    assert json.loads((tmp_path / "run_3" / "metrics.json").read_text()) == {"run": 3}
+
+    figs = [plt.subplots()[0] for _ in range(2)]
+    fio.save_many([(fig, tmp_path / "figs" / f"f{i}.png") for i, fig in enumerate(figs)], kind="figure", dpi=50)
+    for fig in figs:
+        plt.close(fig)
+    assert (tmp_path / "figs" / "f1.png").stat().st_size > 0
+    with pytest.raises(ValueError):
+        fio.save_many([], kind="csv")
+
+
+def test_save_figure_bytes_then_batch_write(tmp_path):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots()
+    ax.plot([0, 1], [1, 0])
+    data = fio.save_figure_bytes(fig, dpi=50)
+    plt.close(fig)
+    assert bytes(data[:8]) == b"\x89PNG\r\n\x1a\n"
+    fio.save_many([(data, tmp_path / "out" / "plot.png")], kind="bytes")
+    assert (tmp_path / "out" / "plot.png").read_bytes() == bytes(data)
+
+
+def test_import_does_not_load_torch(tmp_path):
+    import subprocess
+
+    # a stand-in torch package on the path shows whether importing factors.io pulls torch in
+    (tmp_path / "torch").mkdir()
+    (tmp_path / "torch" / "__init__.py").write_text("class Tensor:\n    pass\n")
+    code = (
+        "import sys; sys.path[:0] = [sys.argv[1], sys.argv[2]]; "
+        "import factors.io, factors.utils; print('torch' in sys.modules)"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code, str(tmp_path), str(SRC)], capture_output=True, text=True, check=True
+    )
+    assert out.stdout.strip() == "False"
+
+
+def test_checkpoint_pickle_roundtrip_without_torch_loaded(tmp_path, monkeypatch):
+    monkeypatch.delitem(sys.modules, "torch", raising=False)
+    obj = {"step": 3, "history": [0.5, 0.25]}
+    fio.save_checkpoint(obj, tmp_path / "state.pt")
+    assert fio.load_checkpoint(tmp_path / "state.pt") == obj
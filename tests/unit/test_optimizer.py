@@ -43,3 +43,102 @@ def test_beam_search_pair_selection_returns_reasonable_solution():
     # Should return between 1 and budget cells (cost units)
     assert isinstance(sel, list)
     assert sc >= 0.0
+
+
+@pytest.mark.parametrize("use_kernel", [True, False])
+def test_exhaustive_best_k_respects_budget(monkeypatch, use_kernel):
+    if not use_kernel:
+        monkeypatch.setattr(fo, "_exhaustive_best_k", None)
+    score = pd.DataFrame([[5.0, 4.0], [3.0, np.nan]], index=["A1", "A2"], columns=["B1", "B2"])
+    cost = pd.DataFrame([[3.0, 1.0], [1.0, 1.0]], index=score.index, columns=score.columns)
+    # (A1,B1)+(A1,B2) scores best but costs 4 > budget; next best pair fits
+    best_sel, best_score = fo.exhaustive_best_k(score, cost=cost, k=2, budget=3.0)
+    assert best_sel == [("A1", "B2"), ("A2", "B1")]
+    assert best_score == pytest.approx(7.0)
+    assert fo.exhaustive_best_k(score, cost=cost, k=2, budget=1.0) == ([], 0.0)
+
+
+def test_greedy_float32_ranking_matches_float64():
+    rng = np.random.default_rng(0)
+    score = pd.DataFrame(rng.normal(size=(6, 5)))
+    cost = pd.DataFrame(rng.integers(1, 4, size=(6, 5)).astype(float))
+    sel32, cost32 = fo.greedy_select_under_budget(score, cost=cost, budget=12.0, dtype=np.float32)
+    sel64, cost64 = fo.greedy_select_under_budget(score, cost=cost, budget=12.0, dtype=np.float64)
+    assert sel32 == sel64
+    assert cost32 == cost64
+
+
+def test_default_ranking_keeps_float64_near_ties_and_sums():
+    # 1000.00001 and 1000.00002 round to the same float32 value; the default ranks at full precision
+    score = pd.DataFrame([[1000.00001, 1000.00002]])
+    assert fo.greedy_select_under_budget(score, budget=1.0)[0] == [(0, 1)]
+    # the beam search score sum is accumulated in float64 whatever the ranking dtype
+    grid = pd.DataFrame(1000.0 + np.random.default_rng(0).standard_normal((8, 8)))
+    total = np.sort(grid.to_numpy().ravel())[-6:].sum()
+    for dtype in (np.float32, np.float64):
+        assert fo.beam_search_pair_selection(grid, budget=6.0, dtype=dtype)[1] == pytest.approx(total, rel=1e-15)
+
+
+def test_stable_top_k_matches_full_stable_sort_with_ties():
+    keys = np.array([3.0, 1.0, 2.0, 1.0, 2.0, 2.0, 0.0, 2.0])
+    for k in range(0, keys.size + 2):
+        np.testing.assert_array_equal(fo._stable_top_k(keys, k), np.argsort(keys, kind="stable")[:k])
+
+
+def test_greedy_blocked_scan_still_skips_to_cheaper_cells():
+    # the expensive top cells exhaust the first block; the cheap low-score cell still fits
+    score = pd.DataFrame(np.arange(40, 0, -1, dtype=float).reshape(4, 10))
+    cost = pd.DataFrame(np.full((4, 10), 5.0))
+    cost.iloc[3, 9] = 1.0
+    sel, total = fo.greedy_select_under_budget(score, cost=cost, budget=11.0)
+    assert sel == [(0, 0), (0, 1), (3, 9)]
+    assert total == pytest.approx(11.0)
+
+
+def test_uniform_cost_fast_path_takes_floor_budget_cells():
+    score = pd.DataFrame([[1.0, 3.0], [np.nan, 2.0]], index=["A1", "A2"], columns=["B1", "B2"])
+    sel, total = fo.greedy_select_under_budget(score, budget=2.5)
+    assert sel == [("A1", "B2"), ("A2", "B2")]
+    assert total == 2.0
+    beam_sel, beam_score = fo.beam_search_pair_selection(score, budget=2.5, beam_width=2)
+    assert sorted(beam_sel) == sorted(sel)
+    assert beam_score == pytest.approx(5.0)
+
+
+@pytest.mark.parametrize("use_kernel", [True, False])
+def test_greedy_scan_kernel_and_python_fallback_agree(monkeypatch, use_kernel):
+    if not use_kernel:
+        monkeypatch.setattr(fo, "_greedy_take", None)
+    rng = np.random.default_rng(1)
+    score = pd.DataFrame(rng.integers(0, 4, size=(5, 6)).astype(float))
+    cost = pd.DataFrame(rng.choice([0.5, 1.0, 2.0], size=(5, 6)))
+    sel, total = fo.greedy_select_under_budget(score, cost=cost, budget=6.0)
+    fits, expected_total = fo._greedy_take_py(
+        np.array([cost.iloc[r, c] for r, c in sel]), np.inf, 0.0
+    )
+    assert fits.all() and total == expected_total <= 6.0
+
+
+def test_parallel_exhaustive_kernel_matches_serial_on_ties():
+    pytest.importorskip("numba")
+    from factors import _opt_kernels as ok
+
+    rng = np.random.default_rng(3)
+    for _ in range(50):
+        n = int(rng.integers(3, 12))
+        score = rng.integers(-2, 3, n).astype(float) * 0.1
+        cost = rng.integers(0, 4, n).astype(float)
+        serial = ok._exhaustive_best_k(score, cost, 3, 6.0)
+        parallel = ok._exhaustive_best_k_parallel(score, cost, 3, 6.0)
+        assert serial[0] == parallel[0]
+        np.testing.assert_array_equal(serial[1], parallel[1])
+
+
+def test_beam_search_counts_each_selection_once():
+    # without deduplication {(0,0),(1,1)} fills both beam slots (reached in two orders) and the
+    # search ends at 23.0; keeping distinct selections finds the cheaper four-cell set
+    score = pd.DataFrame([[9.0, 4.0, 4.0], [5.0, 9.0, 2.0]])
+    cost = pd.DataFrame([[2.0, 1.0, 2.0], [3.0, 2.0, 2.0]])
+    sel, sc = fo.beam_search_pair_selection(score, cost=cost, budget=7.0, beam_width=2, dtype=np.float64)
+    assert sel == [(0, 0), (1, 1), (0, 1), (0, 2)]
+    assert sc == pytest.approx(26.0)
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from factors import pci as fp
+
+
+def test_interaction_matrix_from_cell_means_with_missing_cell():
+    cm = pd.DataFrame([[1.0, 2.0, np.nan], [3.0, 5.0, 4.0]], index=["a1", "a2"], columns=["b1", "b2", "b3"])
+    I = fp.interaction_matrix_from_cell_means(cm)
+    assert list(I.index) == ["a1", "a2"] and list(I.columns) == ["b1", "b2", "b3"]
+    assert np.isnan(I.loc["a1", "b3"])
+    overall = 3.0  # mean of the five observed cells
+    expected = 5.0 - 4.0 - 3.5 + overall  # cell - row mean - column mean + overall
+    assert float(I.loc["a2", "b2"]) == pytest.approx(expected)
+
+
+def test_pci_simple_is_zero_for_additive_table():
+    cm = pd.DataFrame(np.add.outer([0.0, 1.0, 2.0], [10.0, 20.0]))
+    assert fp.pci_simple(cm) == pytest.approx(0.0, abs=1e-12)
@@ -45,3 +45,70 @@ def test_compute_uncertainty_from_bootstrap_dict_input():
     unc_df = fs.compute_uncertainty_from_bootstrap(boot, aggfunc="std")
     assert unc_df.loc["A1", "B1"] > 0.0
     assert "A1" in unc_df.index
+
+
+def test_compute_uncertainty_from_bootstrap_dict_ragged_se():
+    boot = {("A1", "B1"): [1.0, 2.0, 3.0, 4.0], ("A2", "B2"): [1.0, 3.0]}
+    unc_df = fs.compute_uncertainty_from_bootstrap(boot, aggfunc="se")
+    assert float(unc_df.loc["A1", "B1"]) == pytest.approx(np.std([1.0, 2.0, 3.0, 4.0], ddof=1) / 2.0)
+    assert float(unc_df.loc["A2", "B2"]) == pytest.approx(np.std([1.0, 3.0], ddof=1) / np.sqrt(2.0))
+    # cells without replicates stay missing
+    assert np.isnan(unc_df.loc["A1", "B2"])
+
+
+def test_compute_uncertainty_from_bootstrap_multiindex_matches_dict():
+    boot = {("A1", "B1"): [1.0, 1.5, 0.5], ("A2", "B1"): [2.0, 2.4, 1.8], ("A2", "B2"): [3.0, 3.3, 2.6]}
+    df = pd.DataFrame(list(boot.values()), index=pd.MultiIndex.from_tuples(list(boot.keys())))
+    from_df = fs.compute_uncertainty_from_bootstrap(df, aggfunc="std")
+    from_dict = fs.compute_uncertainty_from_bootstrap(boot, aggfunc="std")
+    pd.testing.assert_frame_equal(from_df, from_dict)
+    assert np.isnan(from_df.loc["A1", "B2"])
+
+
+def test_compute_risk_adjusted_score_aligns_reordered_inputs():
+    cm, unc, cost = make_cell_matrices()
+    aligned = fs.compute_risk_adjusted_score(cm, uncertainty=unc, cost=cost, kappa=0.5, rho=0.5)
+    shuffled = fs.compute_risk_adjusted_score(
+        cm, uncertainty=unc.iloc[::-1, ::-1], cost=cost.iloc[::-1], kappa=0.5, rho=0.5
+    )
+    pd.testing.assert_frame_equal(aligned, shuffled)
+    # inputs are not modified in place
+    assert float(cm.loc["A1", "B1"]) == 1.0
+
+
+def test_compute_uncertainty_from_bootstrap_ragged_numpy_aggfunc():
+    boot = {("A1", "B1"): [1.0, 2.0, 6.0], ("A1", "B2"): [2.0, 4.0]}
+    unc_df = fs.compute_uncertainty_from_bootstrap(boot, aggfunc="var")
+    assert float(unc_df.loc["A1", "B1"]) == pytest.approx(np.var([1.0, 2.0, 6.0]))
+    assert float(unc_df.loc["A1", "B2"]) == pytest.approx(1.0)
+
+
+def test_compute_uncertainty_from_bootstrap_npy_path_matches_dict(tmp_path, monkeypatch):
+    rng = np.random.default_rng(0)
+    levels_a, levels_b = ["A1", "A2", "A3"], ["B1", "B2"]
+    boot = {(a, b): rng.standard_normal(50) for a in levels_a for b in levels_b}
+    expected = fs.compute_uncertainty_from_bootstrap(boot, levels_a, levels_b, aggfunc="se")
+    path = tmp_path / "boot.npy"
+    np.save(path, np.stack([boot[(a, b)] for a in levels_a for b in levels_b]))
+    # force several row blocks, for both the memory map and the in-memory dict
+    monkeypatch.setattr(fs, "_REDUCE_BLOCK_BYTES", 2 * 50 * 8)
+    pd.testing.assert_frame_equal(fs.compute_uncertainty_from_bootstrap(path, levels_a, levels_b, aggfunc="se"), expected)
+    pd.testing.assert_frame_equal(fs.compute_uncertainty_from_bootstrap(boot, levels_a, levels_b, aggfunc="se"), expected)
+    with pytest.raises(ValueError):
+        fs.compute_uncertainty_from_bootstrap(str(path))
+
+
+def test_compute_uncertainty_from_bootstrap_ci_matches_replicates():
+    from factors import bootstrap as fb
+
+    rng = np.random.default_rng(1)
+    boot = {(a, b): rng.standard_normal(40) for a in ["A1", "A2"] for b in ["B1", "B2", "B3"]}
+    del boot[("A2", "B3")]
+    levels_a, levels_b = ["A1", "A2"], ["B1", "B2", "B3"]
+    ci = fb.compute_bootstrap_ci_streaming(boot.items())
+    for aggfunc in ("std", "se"):
+        expected = fs.compute_uncertainty_from_bootstrap(boot, levels_a, levels_b, aggfunc=aggfunc)
+        got = fs.compute_uncertainty_from_bootstrap_ci(ci, levels_a, levels_b, n_reps=40, aggfunc=aggfunc)
+        pd.testing.assert_frame_equal(got, expected)
+    with pytest.raises(ValueError):
+        fs.compute_uncertainty_from_bootstrap_ci(ci, levels_a, levels_b, n_reps=40, aggfunc="iqr")
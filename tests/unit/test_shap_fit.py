@@ -65,3 +65,126 @@ def test_compute_shap_explainer_values_skipped_if_shap_unavailable():
     expected, shap_vals = compute_shap_explainer_values(model, X)
     # shap_vals shape should match (n_samples, n_features)
     assert getattr(shap_vals, "shape", None) == (3, 2)
+
+def test_build_design_matrix_matches_dense_one_hot():
+    A = np.array(["b", "a", None, "b"], dtype=object)
+    B = np.array(["x", "y", "x", "y"], dtype=object)
+    design, a_names, b_names = _build_design_matrix_for_two_factors(A, B, drop_first=False)
+    dense = design.sparse.to_dense()
+    A_d = pd.get_dummies(pd.Series(A), prefix="A").astype(float)
+    B_d = pd.get_dummies(pd.Series(B), prefix="B").astype(float)
+    assert a_names == list(A_d.columns) and b_names == list(B_d.columns)
+    np.testing.assert_array_equal(dense[a_names].to_numpy(), A_d.to_numpy())
+    np.testing.assert_array_equal(dense[b_names].to_numpy(), B_d.to_numpy())
+    # the row with a missing A level has no interaction term
+    inter = dense[[c for c in dense.columns if "__x__" in c]].to_numpy()
+    np.testing.assert_array_equal(inter.sum(axis=1), [1.0, 1.0, 0.0, 1.0])
+    assert float(dense.loc[0, "A_b__x__B_x"]) == 1.0
+
+def test_anova_solver_matches_ridge_predictions():
+    rng = np.random.default_rng(0)
+    levels_a = pd.Series(rng.choice(["a", "b", "c"], 200))
+    levels_b = pd.Series(rng.choice(["x", "y"], 200))
+    target = rng.normal(size=200)
+    anova = fit_two_factor_approx_from_shap(target, levels_a, levels_b, alpha=1e-8, solver="anova")
+    ridge = fit_two_factor_approx_from_shap(target, levels_a, levels_b, alpha=1e-8)
+    assert ridge["model"] is not None and ridge["design_matrix"] is not None
+    np.testing.assert_allclose(anova["pred"], ridge["pred"], atol=1e-6)
+    assert anova["model"] is None
+    # effect-coded interactions are centered over rows and columns
+    itab = anova["interaction_table"]
+    np.testing.assert_allclose(itab.sum(axis=0), 0.0, atol=1e-12)
+    np.testing.assert_allclose(itab.sum(axis=1), 0.0, atol=1e-12)
+
+def test_cholesky_solver_matches_ridge_and_reuses_factorization():
+    from factors.shap_fit import TwoFactorFit
+
+    rng = np.random.default_rng(1)
+    levels_a = pd.Series(rng.choice(["a", "b", "c"], 120))
+    levels_b = pd.Series(rng.choice(["x", "y", "z"], 120))
+    target = rng.normal(size=120)
+    chol = fit_two_factor_approx_from_shap(target, levels_a, levels_b, alpha=1e-3, solver="cholesky")
+    ridge = fit_two_factor_approx_from_shap(target, levels_a, levels_b, alpha=1e-3, solver="ridge")
+    np.testing.assert_allclose(chol["pred"], ridge["pred"], atol=1e-6)
+    assert isinstance(chol["model"], TwoFactorFit)
+    # a second target with the same factor columns reuses the cached factorization
+    again = fit_two_factor_approx_from_shap(rng.normal(size=120), levels_a, levels_b, alpha=1e-3, solver="cholesky")
+    assert again["model"] is chol["model"]
+
+def test_compute_shap_explainer_values_disk_cache(monkeypatch, tmp_path):
+    # stand-in for shap.Explainer that counts how often an explanation is computed
+    import types
+    import factors.shap_fit as sf
+
+    calls = []
+
+    class _Explainer:
+        def __init__(self, fn, masker):
+            self.fn = fn
+
+        def __call__(self, X):
+            calls.append(1)
+            out = np.asarray(self.fn(X), dtype=float)
+            return types.SimpleNamespace(base_values=float(out.mean()), values=np.outer(out, [1.0, 0.0]))
+
+    monkeypatch.setattr(sf, "shap", types.SimpleNamespace(Explainer=_Explainer))
+    from sklearn.linear_model import LinearRegression
+
+    X = pd.DataFrame({"x1": [0.0, 1.0, 2.0], "x2": [1.0, 0.5, -1.0]})
+    model = LinearRegression().fit(X, X["x1"] * 0.5)
+    first = sf.compute_shap_explainer_values(model, X, cache_dir=str(tmp_path))
+    second = sf.compute_shap_explainer_values(model, X, cache_dir=str(tmp_path))
+    assert len(calls) == 1
+    np.testing.assert_array_equal(first[1], second[1])
+    # different inputs miss the cache
+    sf.compute_shap_explainer_values(model, X * 2.0, cache_dir=str(tmp_path))
+    assert len(calls) == 2
+    # without a cache directory every call recomputes
+    monkeypatch.delenv("FACTORS_CACHE_DIR", raising=False)
+    sf.compute_shap_explainer_values(model, X)
+    assert len(calls) == 3
+
+def test_shap_cache_key_tracks_function_code(monkeypatch):
+    import types
+    import factors.shap_fit as sf
+
+    X = pd.DataFrame({"x1": [0.0, 1.0]})
+
+    def predictor(body):
+        # same module and qualified name, different code, as after editing a module-level function
+        module = types.ModuleType("fake_models")
+        exec(f"def predict(data):\n    return {body}\n", module.__dict__)
+        monkeypatch.setitem(sys.modules, "fake_models", module)
+        return module.predict
+
+    key = sf._shap_cache_key(predictor("data['x1'] * 2.0"), X, None)
+    assert key is not None
+    assert key == sf._shap_cache_key(predictor("data['x1'] * 2.0"), X, None)
+    assert key != sf._shap_cache_key(predictor("data['x1'] * 3.0"), X, None)
+
+def test_small_ridge_problems_are_solved_exactly():
+    rng = np.random.default_rng(1)
+    levels_a = pd.Series(rng.choice(["a", "b", "c"], 150))
+    levels_b = pd.Series(rng.choice(["x", "y", "z", "w"], 150))
+    target = rng.normal(size=150)
+    res = fit_two_factor_approx_from_shap(target, levels_a, levels_b, alpha=1e-3)
+    # 3 x 4 cells: exact Cholesky solve, same dictionary as the conjugate-gradient path
+    assert res["model"].solver == "cholesky"
+    assert res["design_matrix"] is not None
+    chol = fit_two_factor_approx_from_shap(target, levels_a, levels_b, alpha=1e-3, solver="cholesky")
+    np.testing.assert_allclose(res["model"].coef_, chol["model"].coef(target), atol=1e-10)
+
+def test_ridge_paths_reuse_categorical_codes(monkeypatch):
+    rng = np.random.default_rng(2)
+    levels_a = pd.Series(pd.Categorical(rng.choice(["a", "b", "c"], 60), categories=["a", "b", "c"]))
+    levels_b = pd.Series(pd.Categorical(rng.choice(["x", "y"], 60), categories=["x", "y"]))
+    target = rng.normal(size=60)
+    expected = fit_two_factor_approx_from_shap(target, levels_a.astype(str), levels_b.astype(str), alpha=1e-3)
+
+    def no_factorize(*args, **kwargs):
+        raise AssertionError("categorical factors should not be re-factorized")
+
+    monkeypatch.setattr(pd, "factorize", no_factorize)
+    for solver in ("ridge", "cholesky"):
+        res = fit_two_factor_approx_from_shap(target, levels_a, levels_b, alpha=1e-3, solver=solver)
+        np.testing.assert_allclose(res["pred"], expected["pred"], atol=1e-8)
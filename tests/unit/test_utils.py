@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+import numpy as np
+import pytest
+
+from factors import io as fio
+from factors import utils as fu
+
+
+def test_checkpoint_manager_async_save_snapshots_arrays(tmp_path):
+    mgr = fu.CheckpointManager(tmp_path / "ckpt", async_save=True)
+    state = {"w": np.zeros(4), "step": 1}
+    path = mgr.save(state, "step_1")
+    # in-place updates after save() must not leak into the queued checkpoint
+    state["w"] += 1.0
+    mgr.wait()
+    loaded = fio.load_checkpoint(path)
+    np.testing.assert_array_equal(np.asarray(loaded["w"]), np.zeros(4))
+    assert mgr.latest() == path
+    mgr.close()
+
+
+def test_checkpoint_manager_async_save_reraises_on_wait(tmp_path, monkeypatch):
+    def fail(obj, path):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(fio, "save_checkpoint", fail)
+    mgr = fu.CheckpointManager(tmp_path, async_save=True)
+    mgr.save({"step": 1}, "step_1")
+    # a lookup does not raise; the failure is left to wait(), which raises it once
+    assert mgr.latest() is None
+    with pytest.raises(OSError, match="disk full"):
+        mgr.wait()
+    mgr.wait()
+    assert mgr.latest() is None
+    mgr.close()
+
+
+def test_checkpoint_manager_latest_tracks_saves_and_rescans(tmp_path):
+    fio.save_checkpoint({"step": 0}, tmp_path / "old.pt")
+    mgr = fu.CheckpointManager(tmp_path)
+    assert mgr.latest() == tmp_path / "old.pt"
+    first = mgr.save({"step": 1}, "step_1")
+    second = mgr.save({"step": 2}, "step_2")
+    assert mgr.latest() == second
+    second.unlink()
+    assert mgr.latest() in {first, tmp_path / "old.pt"}
+
+
+def test_timer_reports_monotonic_elapsed_to_logger():
+    messages = []
+    with fu.Timer("step", logger=messages.append) as t:
+        sum(range(1000))
+    assert t.elapsed_ns > 0
+    assert messages == [f"[Timer] step finished in {t.elapsed:.3f} s"]
+    with fu.Timer(logger=None) as quiet:
+        pass
+    assert quiet.elapsed >= 0.0
+
+
+def test_enable_deterministic_torch_validates_mode():
+    with pytest.raises(ValueError):
+        fu.enable_deterministic_torch(mode="sometimes")
+    # "off" never touches torch
+    fu.enable_deterministic_torch(mode="off")
+
+
+def test_ensure_dir_cached_returns_same_path(tmp_path):
+    target = str(tmp_path / "a" / "b")
+    first = fu.ensure_dir_cached(target)
+    assert first.is_dir()
+    assert fu.ensure_dir_cached(target) is first
+    # the uncached helper is idempotent on existing directories
+    assert fu.ensure_dir(first) == first
+
+
+def test_set_seed_leaves_hash_seed_to_the_launcher(monkeypatch):
+    monkeypatch.delenv("PYTHONHASHSEED", raising=False)
+    fu.set_seed(3)
+    assert "PYTHONHASHSEED" not in fu.os.environ
+    with pytest.warns(RuntimeWarning, match="PYTHONHASHSEED=3"):
+        assert fu.warn_if_hash_seed_unset(3)
+    monkeypatch.setenv("PYTHONHASHSEED", "3")
+    assert not fu.warn_if_hash_seed_unset(3)
+
+
+def test_set_seed_reseeds_module_generator_in_place():
+    rng = fu.RNG
+    fu.set_seed(5)
+    assert fu.RNG is rng
+    np.testing.assert_array_equal(rng.random(4), fu.make_rng(5).random(4))